@@ -1,20 +1,338 @@
-from fastapi import FastAPI, HTTPException
-from screener import Screener
+import asyncio
+import functools
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from dotenv import load_dotenv
+from config.jobs import OK, JobRunner, JobStore
+from config.logger import logger
+from config.metrics import METRICS, profiled
+from config.response_cache import ResponseCache
+from schema.base_schema import Symbols
+
+# the settings below, and the Screener credentials, may come from .env
+load_dotenv()
+
+# AsyncScreener, with pandas / pyarrow / httpx behind it, is built off the event loop once the
+# server is up (see get_screener) rather than when this module is imported
+screener_api = None
+_screener_ready = None
+# Excel parsing + melting is blocking CPU work; keep it off the event loop on a bounded pool.
+# Like the job runner (and its SQLite file) it is set up in the lifespan
+parse_executor = None
+job_runner = None
+# ?profile=true on /screener/{symbol} is honoured only when this is set
+PROFILING_ENABLED = os.getenv("SCREENER_PROFILING", "").lower() in ("1", "true", "yes")
+# parsed /screener/{symbol} bodies; concurrent requests for one symbol share a single upstream fetch
+response_cache = ResponseCache(ttl=int(os.getenv("SCREENER_CACHE_TTL", "300")),
+                               max_entries=int(os.getenv("SCREENER_CACHE_SIZE", "256")))
+# /timeseries: symbols loaded ahead of the one being streamed, and the most symbols per request
+TIMESERIES_PREFETCH = int(os.getenv("SCREENER_TIMESERIES_PREFETCH", "4"))
+TIMESERIES_MAX_SYMBOLS = int(os.getenv("SCREENER_TIMESERIES_MAX_SYMBOLS", "500"))
+
+
+def _create_screener():
+    global screener_api
+    from async_screener import AsyncScreener
+    import config.streaming  # noqa: F401  (pyarrow) loaded here, not in the first /timeseries request
+
+    if screener_api is None:
+        screener_api = AsyncScreener()
+    return screener_api
+
+
+def _start_screener():
+    global _screener_ready
+    if _screener_ready is None:
+        _screener_ready = asyncio.ensure_future(asyncio.to_thread(_create_screener))
+        _screener_ready.add_done_callback(_screener_done)
+    return _screener_ready
+
+
+def _screener_done(future):
+    global _screener_ready
+    if future.cancelled() or future.exception() is None:
+        return
+    logger.error(f"Could not create the screener: {future.exception()}")
+    # forget the failure so the next request tries again instead of re-raising it
+    if _screener_ready is future:
+        _screener_ready = None
+
+
+async def get_screener():
+    """The shared AsyncScreener; the first caller (normally the lifespan) starts building it."""
+    return await asyncio.shield(_start_screener())
+
+
+async def _run_job_item(symbol):
+    # every job worker shares screener_api's logged-in session and the parse pool
+    api = await get_screener()
+    df = await api.get_timeseries(symbol, executor=parse_executor)
+    if df.empty:
+        # get_timeseries logs and swallows failures; report the one that stopped this symbol
+        error = api.fetch_errors.pop(symbol, None)
+        raise ValueError(error or f"No rows could be parsed from the export of {symbol}")
+    return len(df)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global screener_api, _screener_ready, parse_executor, job_runner
+    # not awaited: the worker starts serving while the imports run, requests that need it wait
+    _start_screener()
+    parse_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SCREENER_PARSE_WORKERS", "4")),
+                                        thread_name_prefix="screener-parse")
+    job_runner = JobRunner(JobStore(os.getenv("SCREENER_JOBS_DB", "cache/jobs.sqlite3")), _run_job_item,
+                           workers=int(os.getenv("SCREENER_JOB_WORKERS", "4")))
+    await job_runner.start()
+    yield
+    await job_runner.stop()
+    job_runner.store.close()
+    if _screener_ready is not None:
+        await asyncio.wait([_screener_ready])
+    if screener_api is not None:
+        await screener_api.aclose()
+    screener_api = _screener_ready = None
+    parse_executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
-screener_api = Screener()
 
 @app.get("/")
 def root():
     return {"message": "Hello World"}
 
 
-@app.get("/screener/{symbol}")
-def screener(symbol: str):
-    file_path = screener_api.fetch_data(symbol)
+@app.get("/metrics")
+def metrics(format: str = "prometheus"):
+    """Stage timings, byte and row counters in Prometheus text format (or ?format=json)."""
+    if format == "json":
+        return METRICS.snapshot()
+    return Response(content=METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+def _parse_to_json(api, file_path, symbol):
+    data = api.read_excel(file_path, symbol)
+    if data.empty:
+        raise HTTPException(status_code=500, detail=f"Something went wrong while fetching data for {symbol}")
+    # serialising here keeps the per-row JSON encoding off the event loop as well
+    with METRICS.timer("to_json") as span:
+        body = f'{{"symbol": {json.dumps(symbol)}, "data": {data.to_json(orient="records", date_format="iso")}}}'
+        body = body.encode()
+        span.bytes = len(body)
+    return body
+
+
+def _profiled_parse_to_json(api, file_path, symbol):
+    with profiled(f"screener-{symbol}") as profile:
+        body = _parse_to_json(api, file_path, symbol)
+    return body, profile["path"]
+
+
+async def _fetch_and_parse(symbol, parse=_parse_to_json):
+    api = await get_screener()
+    file_path = await api.fetch_data(symbol)
     if not file_path:
         raise HTTPException(status_code=404, detail=f"No file generated for {symbol}")
-    data = screener_api.read_excel(file_path)
-    if not data:
-        raise HTTPException(status_code=500, detail=f"Something went wrong while fetching data for {symbol}")
-    return {"symbol": symbol, "data": data}
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(parse_executor, functools.partial(parse, api), file_path, symbol)
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+@app.get("/screener/{symbol}")
+async def screener(symbol: str, request: Request, profile: bool = False):
+    with METRICS.timer("request", endpoint="screener"):
+        if profile and PROFILING_ENABLED:
+            # profiled requests always run the whole pipeline; cProfile covers the parse in the
+            # executor thread, not the (shared) event loop
+            body, profile_path = await _fetch_and_parse(symbol, _profiled_parse_to_json)
+            return Response(content=body, media_type="application/json", headers={"X-Profile-Path": profile_path})
+
+        entry = await response_cache.get_or_create(symbol, lambda: _fetch_and_parse(symbol))
+        headers = {"ETag": entry.etag, "Cache-Control": f"max-age={response_cache.remaining_ttl(entry)}"}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _split(values):
+    """Query values given repeated and / or comma-separated."""
+    return [v.strip() for value in values or [] for v in value.split(",") if v.strip()]
+
+
+def _encode_page(encoder, df, filters, page):
+    from config.streaming import filter_timeseries
+
+    df = filter_timeseries(df, **filters)
+    skip = min(page["offset"], len(df))
+    page["offset"] -= skip
+    df = df.iloc[skip:]
+    if page["limit"] is not None:
+        df = df.iloc[:page["limit"]]
+        page["limit"] -= len(df)
+    return encoder.encode(df)
+
+
+async def _stream_timeseries(symbols, load, encoder, filters, page):
+    """Encoded chunks of each symbol's load(symbol) (awaited, a few symbols ahead), filtered and paged."""
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    queue = iter(symbols)
+
+    def prefetch():
+        while len(pending) < TIMESERIES_PREFETCH:
+            symbol = next(queue, None)
+            if symbol is None:
+                return
+            task = asyncio.ensure_future(load(symbol))
+            pending.append((symbol, task))
+
+    try:
+        prefetch()
+        while pending and page["limit"] != 0:
+            symbol, task = pending.popleft()
+            df = await task
+            prefetch()
+            if df is None or df.empty:
+                logger.warning(f"No timeseries for {symbol}, skipped in stream")
+                continue
+            chunk = await loop.run_in_executor(parse_executor, _encode_page, encoder, df, filters, page)
+            if chunk:
+                yield chunk
+        tail = encoder.close()
+        if tail:
+            yield tail
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+@app.get("/timeseries")
+async def timeseries(
+    symbols: List[str] = Query(..., description="repeated or comma-separated"),
+    format: str = "ndjson",
+    columns: Optional[List[str]] = Query(None, description="projection, repeated or comma-separated"),
+    metric_name: Optional[List[str]] = Query(None),
+    period_code: Optional[List[str]] = Query(None),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=0),
+    max_age: Optional[int] = None,
+):
+    """
+    Long-form timeseries of one or more symbols streamed as NDJSON, an Arrow
+    IPC stream or Parquet, one symbol at a time. Rows can be filtered by
+    metric_name, period_code and period_end in [start, end], projected to
+    `columns` and paged with offset / limit over the filtered rows.
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in _split(symbols)))
+    if not symbols or len(symbols) > TIMESERIES_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"Give between 1 and {TIMESERIES_MAX_SYMBOLS} symbols")
+
+    async def load(symbol):
+        api = await get_screener()
+        return await api.get_timeseries(symbol, max_age, parse_executor)
+
+    response = _timeseries_response(symbols, load, format, columns, metric_name, period_code, start, end, offset,
+                                    limit)
+    await get_screener()  # a screener that can't be built is a 500 here, not a broken stream
+    return response
+
+
+def _timeseries_response(symbols, load, format, columns, metric_name, period_code, start, end, offset, limit):
+    """StreamingResponse of load(symbol) for each symbol, in the requested format; 400 on bad parameters."""
+    from config.streaming import MEDIA_TYPES, WIRE_SCHEMA, TimeseriesEncoder
+
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(MEDIA_TYPES)}")
+    columns = _split(columns) or None
+    unknown = sorted(set(columns or []) - set(WIRE_SCHEMA.names))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns {unknown}; available: {WIRE_SCHEMA.names}")
+
+    filters = {"metrics": _split(metric_name) or None, "period_codes": _split(period_code) or None,
+               "start": start, "end": end, "columns": columns}
+    encoder = TimeseriesEncoder(format, columns)
+    page = {"offset": offset, "limit": limit}
+    return StreamingResponse(_stream_timeseries(symbols, load, encoder, filters, page),
+                             media_type=encoder.media_type)
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(body: Symbols):
+    """Queue a batch of symbols; poll GET /jobs/{job_id} or stream /jobs/{job_id}/events."""
+    job_id = job_runner.submit(body.symbols)
+    return job_runner.store.get(job_id, items=False)
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, items: bool = True):
+    job = job_runner.store.get(job_id, items=items)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+async def _job_events(job_id, interval):
+    last = None
+    while True:
+        job = job_runner.store.get(job_id, items=False)
+        state = (job["counts"], job["status"])
+        if state != last:
+            last = state
+            yield (json.dumps(job) + "\n").encode()
+        if job["status"] == "done":
+            return
+        await asyncio.sleep(interval)
+
+
+@app.get("/jobs/{job_id}/events")
+def job_events(job_id: str, interval: float = Query(0.5, ge=0.05, le=30)):
+    """NDJSON progress stream: one job summary per change, ending when the job is done."""
+    if job_runner.store.get(job_id, items=False) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return StreamingResponse(_job_events(job_id, interval), media_type="application/x-ndjson")
+
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str, format: str = "ndjson",
+                      columns: Optional[List[str]] = Query(None),
+                      metric_name: Optional[List[str]] = Query(None),
+                      period_code: Optional[List[str]] = Query(None),
+                      start: Optional[date] = None, end: Optional[date] = None):
+    """
+    Timeseries of the job's finished symbols, streamed like /timeseries. Rows
+    come from the report store as the job left them: no symbol limit, and
+    nothing is refetched however old the entries are.
+    """
+    job = job_runner.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    symbols = [item["symbol"] for item in job["items"] if item["status"] == OK]
+    if not symbols:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has no finished symbols yet")
+
+    async def load(symbol):
+        store = (await get_screener()).report_store
+        return await asyncio.get_running_loop().run_in_executor(parse_executor, store.latest_timeseries, symbol)
+
+    response = _timeseries_response(symbols, load, format, columns, metric_name, period_code, start, end,
+                                    offset=0, limit=None)
+    await get_screener()
+    return response
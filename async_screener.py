@@ -0,0 +1,251 @@
+import asyncio
+import os
+import tempfile
+
+import httpx
+import pandas as pd
+
+from config.html_extract import CSRF_INPUT, EXPORT_BUTTON, afind_tag, find_tag
+from config.logger import logger
+from config.metrics import METRICS, instrumented
+from config.session_store import CookieJarStore, drop_session_cookie, session_cookie
+from config.symbol_cache import MISS
+from screener import LONG_COLUMNS, ScreenerBase
+
+
+async def _acounted(chunks, span):
+    async for chunk in chunks:
+        span.bytes += len(chunk)
+        yield chunk
+
+
+class AsyncScreener(ScreenerBase):
+    """
+    asyncio counterpart of Screener. login, fetch_symbol and fetch_data run on
+    one pooled httpx.AsyncClient; parsing (read_excel, combine, melt) comes from
+    ScreenerBase unchanged and is blocking, so callers should run it in an
+    executor. The requests-based helpers (fetch_many, warm_symbol_cache,
+    session_pool) are Screener's only.
+    """
+
+    def __init__(self, base_url="https://www.screener.in", reports_dir="reports", symbol_cache=None,
+                 report_store=None, session_path=None, max_connections=20):
+        super().__init__(base_url=base_url, reports_dir=reports_dir, symbol_cache=symbol_cache,
+                         report_store=report_store, session_path=session_path)
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(30.0),
+            follow_redirects=True,
+        )
+        self.cookie_store = CookieJarStore(self.session_path) if self.session_path else None
+        if self.cookie_store and self.cookie_store.load(self.client.cookies.jar):
+            logger.info(f"Restored session from {self.cookie_store.path}")
+        self._login_lock = asyncio.Lock()
+
+    def _sessionid(self, session=None):
+        cookie = session_cookie(self.client.cookies.jar)
+        return cookie.value if cookie else None
+
+    def is_logged_in(self, session=None):
+        return self._sessionid() is not None
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    @instrumented("login")
+    async def login(self, stale=None):
+        """Log in unless there is a live sessionid other than `stale` (one the server rejected)."""
+        # concurrent requests on a cold client must not all log in at once
+        async with self._login_lock:
+            current = self._sessionid()
+            if current is not None and current != stale:
+                logger.info("Already logged in.")
+                return
+            if current is not None:
+                drop_session_cookie(self.client.cookies.jar)
+                if self.cookie_store:
+                    self.cookie_store.clear()
+
+            try:
+                r = await self.client.get(self.login_url)
+                r.raise_for_status()
+
+                input_token = find_tag([r.content], *CSRF_INPUT)
+                if input_token:
+                    self.csrfmiddlewaretoken = input_token.get("value")
+                    logger.info(f"middleware token: {self.csrfmiddlewaretoken}")
+                else:
+                    logger.error("Login failed, csrfmiddlewaretoken not found.")
+                    return
+
+                payload = {"username": self.email, "password": self.password,
+                           "csrfmiddlewaretoken": self.csrfmiddlewaretoken}
+
+                login_resp = await self.client.post(self.login_url, data=payload,
+                                                    headers={"Referer": self.login_url})
+                login_resp.raise_for_status()
+                logger.info(login_resp.status_code)
+                if self.is_logged_in():
+                    logger.info(f"Session ID: {self._sessionid()}")
+                    if self.cookie_store:
+                        self.cookie_store.save(self.client.cookies.jar)
+                else:
+                    logger.error("Login failed, sessionid not found.")
+
+            except httpx.HTTPError as e:
+                logger.error(f"Login failed: {e}")
+
+            except Exception as e:
+                logger.error(f"Unable to login: {e}")
+
+    @instrumented("fetch_symbol")
+    async def fetch_symbol(self, symbol):
+        cached = self.symbol_cache.get(symbol) if self.symbol_cache else MISS
+        METRICS.inc("screener_symbol_cache_total", result="miss" if cached is MISS else "hit")
+        if cached is not MISS:
+            logger.info(f"Cached company url for {symbol}: {cached}")
+            return cached
+
+        try:
+            param = {
+                "q": symbol,
+                "v": 3,
+                "fts": 1
+            }
+            data = await self.client.get(self.symbol_url, params=param)
+            data.raise_for_status()
+            results = data.json()
+            if not results:
+                if self.symbol_cache:
+                    # unknown ticker: remember for negative_ttl so it doesn't hit search again
+                    self.symbol_cache.put(symbol, None)
+                logger.info(f"No company found for symbol {symbol}")
+                return None
+            company_url = (results[0]['url'])
+            logger.info(f"Fetched company url: {company_url}")
+            if self.symbol_cache:
+                self.symbol_cache.put(symbol, company_url)
+            return company_url
+
+        except httpx.HTTPError as e:
+            logger.error(f"Something went wrong while fetching symbol URL: {e}")
+        except (ValueError, IndexError, KeyError) as e:
+            logger.error(f"Something went wrong while fetching symbol URL: {e}")
+        except Exception as e:
+            logger.error(f"Something went wrong while fetching symbol URL: {e}")
+        return None
+
+    async def fetch_data(self, symbol):
+        try:
+            await self.login()
+            filepath = await self._download_export(symbol)
+            self.fetch_errors.pop(symbol, None)
+            return filepath
+        except Exception as e:
+            logger.error(f"Something went wrong while fetching data: {e}")
+            self.fetch_errors[symbol] = str(e)
+        return None
+
+    async def _download_export(self, symbol):
+        company_url = await self.fetch_symbol(symbol=symbol)
+        if not company_url:
+            raise Exception(f"❌ Could not resolve company url for {symbol}")
+        url = f"{self.base_url}{company_url}"
+        logger.info(url)
+        with METRICS.timer("company_page") as span:
+            stale = self._sessionid()
+            for attempt in (0, 1):
+                async with self.client.stream("GET", url) as res:
+                    if not attempt and self.login_required(res):
+                        await self._relogin(res, stale)
+                        continue
+                    res.raise_for_status()
+                    chunks = _acounted(res.aiter_bytes(chunk_size=16384), span)
+                    btn = await afind_tag(chunks, *EXPORT_BUTTON)
+                    # the rest of the page is read unparsed, so the connection goes back to the pool
+                    async for _ in chunks:
+                        pass
+                    break
+
+        if not btn or "formaction" not in btn:
+            raise Exception("❌ Could not find export button on page")
+
+        export_url = f"{self.base_url}{btn['formaction']}"
+        logger.info(f"Downloading from {export_url}")
+
+        os.makedirs(self.reports_dir, exist_ok=True)
+        filepath = os.path.join(self.reports_dir, f"export_{company_url.split('/')[2]}.xlsx")
+
+        with METRICS.timer("export_download") as span:
+            stale = self._sessionid()
+            for attempt in (0, 1):
+                csrftoken = self.client.cookies.get("csrftoken")
+                if not csrftoken:
+                    raise Exception("❌ csrftoken not found in cookies")
+
+                headers = {
+                    "Referer": url,  # must match company page
+                    "X-CSRFToken": csrftoken,  # Django requires this
+                }
+                async with self.client.stream("POST", export_url, headers=headers) as resp:
+                    logger.info(resp.status_code)
+                    if not attempt and self.login_required(resp):
+                        await self._relogin(resp, stale)
+                        continue
+                    if resp.status_code != 200 or self.login_required(resp):
+                        body = await resp.aread()
+                        raise Exception(f"❌ Failed to download file. Status {resp.status_code}: {body[:200]!r}")
+
+                    # concurrent downloads of the same symbol must not interleave writes into one file
+                    fd, tmp_path = tempfile.mkstemp(dir=self.reports_dir, suffix=".part")
+                    try:
+                        with os.fdopen(fd, "wb") as f:
+                            async for chunk in resp.aiter_bytes(chunk_size=8192):
+                                f.write(chunk)
+                                span.bytes += len(chunk)
+                        os.replace(tmp_path, filepath)
+                    except BaseException:
+                        os.unlink(tmp_path)
+                        raise
+                    return filepath
+
+    async def _relogin(self, resp, stale):
+        logger.warning(f"Session rejected ({resp.status_code} at {resp.url}), logging in again")
+        METRICS.inc("screener_relogin_total")
+        await self.login(stale=stale)
+
+    async def get_timeseries(self, symbol, max_age=None, executor=None):
+        """
+        Async Screener.get_timeseries: same report store policy, with the
+        download awaited and the store reads / parse run on `executor`.
+        """
+        loop = asyncio.get_running_loop()
+        store = self.report_store
+        record = store.latest(symbol)
+        if record and store.is_fresh(symbol, max_age):
+            cached = await loop.run_in_executor(executor, store.load_timeseries, record["sha256"], symbol)
+            if cached is not None:
+                logger.info(f"Using cached timeseries for {symbol} ({record['sha256'][:12]})")
+                return cached
+
+        filepath = await self.fetch_data(symbol)
+        if not filepath:
+            if record:
+                cached = await loop.run_in_executor(executor, store.load_timeseries, record["sha256"], symbol)
+                if cached is not None:
+                    logger.warning(f"Refetch failed for {symbol}, serving stale timeseries")
+                    return cached
+            return pd.DataFrame(columns=LONG_COLUMNS)
+
+        sha, changed = await loop.run_in_executor(executor, store.record, symbol, filepath)
+        if not changed:
+            cached = await loop.run_in_executor(executor, store.load_timeseries, sha, symbol)
+            if cached is not None:
+                logger.info(f"Export for {symbol} unchanged ({sha[:12]}), skipping parse")
+                return cached
+
+        timeseries = await loop.run_in_executor(executor, self.read_excel, filepath, symbol)
+        if not timeseries.empty:
+            await loop.run_in_executor(executor, store.save_timeseries, sha, timeseries)
+        return timeseries
@@ -0,0 +1,182 @@
+"""
+Micro-benchmark the original string-cleaning combine against Screener.combine_typed.
+
+    python benchmarks/bench_combine.py reports/ --repeat 20
+
+Sections are parsed once per export; each combine variant is then timed on
+the annual (pnl + balance + cashflow) and quarterly blocks. Reports best wall
+time and peak traced memory per symbol, and checks the outputs agree.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.utils import parse_sections  # noqa: E402
+from config.xlsx_reader import read_data_sheet  # noqa: E402
+from screener import Screener  # noqa: E402
+
+
+def combine_reference(dfs, period_code="A"):
+    """The string-cleaning combine that combine_typed replaced, kept as the baseline."""
+    frames = []
+    for name, df in dfs.items():
+        df = pd.DataFrame(df)
+        df.columns = df.columns.str.lower()
+        df = df.add_suffix(f"_{name}")
+        frames.append(df)
+
+    combined_df = pd.concat(frames, axis=1)
+
+    combined_df = combined_df.rename(columns={'price:_cashflow': 'price'})
+    if 'derived:_cashflow' in combined_df.columns:
+        combined_df = combined_df.drop('derived:_cashflow', axis=1)
+
+    for col in combined_df.columns:
+        combined_df[col] = (
+            combined_df[col]
+            .astype(str)
+            .str.replace(',', '', regex=False)
+            .str.strip()
+        )
+        try:
+            combined_df[col] = pd.to_numeric(combined_df[col], errors='coerce')
+        except Exception:
+            pass
+
+    for col in combined_df.columns:
+        if 'report date' in col:
+            combined_df['timestamp'] = pd.to_datetime(combined_df[col], errors='coerce')
+            break
+
+    if period_code == 'A':
+        combined_df['expenses_pnl'] = (
+                combined_df['raw material cost_pnl'] +
+                combined_df['power and fuel_pnl'] +
+                combined_df['other mfr. exp_pnl'] +
+                combined_df['employee cost_pnl'] +
+                combined_df['selling and admin_pnl'] +
+                combined_df['other expenses_pnl'] +
+                -1 * combined_df['change in inventory_pnl']
+        )
+
+        combined_df['operating_profit_pnl'] = combined_df['sales_pnl'] - combined_df['expenses_pnl']
+
+        combined_df['dividend_payout_pnl'] = np.where(
+            combined_df['net profit_pnl'] > 0,
+            round((combined_df['dividend amount_pnl'] / combined_df['net profit_pnl']) * 100, 2),
+            0
+        )
+
+        combined_df['EPS'] = np.where(
+            combined_df['adjusted equity shares in cr_cashflow'] > 0,
+            round(combined_df['net profit_pnl'] / combined_df['adjusted equity shares in cr_cashflow'], 2),
+            0
+        )
+
+        combined_df['yearly OPM'] = np.where(
+            combined_df['operating_profit_pnl'] > 0,
+            np.round(
+                round((combined_df['operating_profit_pnl'] / combined_df['sales_pnl']) * 100, 2)),
+            0
+        )
+
+        combined_df['ROE'] = np.where(
+            (combined_df['equity share capital_balance'] + combined_df['reserves_balance']) > 0,
+            np.round(
+                round((combined_df['net profit_pnl'] / (
+                        combined_df['equity share capital_balance'] + combined_df['reserves_balance'])) * 100, 2)),
+            0
+        )
+
+        combined_df['price_to_earning'] = np.where(
+            combined_df['EPS'] > 0,
+            round(combined_df['price'] / combined_df['EPS'], 2),
+            0
+        )
+
+        combined_df['working_capital'] = (
+                combined_df['other assets_balance'] - combined_df['other liabilities_balance']
+        )
+
+        combined_df['debtor_days'] = np.where(
+            combined_df['sales_pnl'] > 0,
+            round(combined_df['receivables_balance'] / (combined_df['sales_pnl'] / 365), 2),
+            0
+        )
+
+        combined_df['inventory_turnover'] = np.where(
+            combined_df['inventory_balance'] > 0,
+            round(combined_df['sales_pnl'] / combined_df['inventory_balance'], 2),
+            0
+        )
+
+    elif period_code == 'Q':
+        combined_df['quarterly OPM_quarters'] = np.where(
+            combined_df['sales_quarters'] > 0,
+            np.round(
+                combined_df['operating profit_quarters'] / combined_df['sales_quarters'] * 100),
+            0
+        )
+
+    combined_df['period_code'] = period_code
+    return combined_df
+
+
+def run(combine, sections, **kwargs):
+    annual = combine({name: sections[name] for name in ("pnl", "balance", "cashflow")}, period_code="A", **kwargs)
+    quarterly = combine({"quarters": sections["quarters"]}, period_code="Q", **kwargs)
+    return annual, quarterly
+
+
+def measure(combine, sections, repeat, **kwargs):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(combine, sections, **kwargs)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = run(combine, sections, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", default="reports")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.directory, "export_*.xlsx")))
+    if not files:
+        sys.exit(f"No export_*.xlsx files in {args.directory}")
+
+    screener = Screener(symbol_cache=False, report_store=False)
+    variants = {
+        "combine": (combine_reference, {}),
+        "typed64": (screener.combine_typed, {}),
+        "typed32": (screener.combine_typed, {"dtype": "float32"}),
+    }
+
+    print(f"{'file':<30} {'variant':<10} {'best ms':>10} {'peak KiB':>10}")
+    for path in files:
+        sections = parse_sections(read_data_sheet(path))
+        results = {}
+        for name, (combine, kwargs) in variants.items():
+            results[name], seconds, peak = measure(combine, sections, args.repeat, **kwargs)
+            print(f"{os.path.basename(path):<30} {name:<10} {seconds * 1000:>10.2f} {peak / 1024:>10.1f}")
+        for reference, typed in zip(results["combine"], results["typed64"]):
+            pd.testing.assert_frame_equal(reference, typed, check_dtype=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the streaming "Data Sheet" reader against pd.read_excel (openpyxl).
+
+    python benchmarks/bench_excel_engines.py reports/ --repeat 3
+
+Every export_*.xlsx in the directory is read with both engines; the raw grids
+are checked for equality and the best wall time / peak traced memory per file
+is reported.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.xlsx_reader import read_data_sheet  # noqa: E402
+
+ENGINES = {
+    "openpyxl": lambda path: pd.read_excel(path, sheet_name="Data Sheet", header=None),
+    "stream": lambda path: read_data_sheet(path, sheet_name="Data Sheet"),
+}
+
+
+def measure(func, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", default="reports")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.directory, "export_*.xlsx")))
+    if not files:
+        sys.exit(f"No export_*.xlsx files in {args.directory}")
+
+    totals = {name: [0.0, 0] for name in ENGINES}
+    print(f"{'file':<30} {'engine':<10} {'best s':>10} {'peak MiB':>10}")
+    for path in files:
+        grids = {}
+        for name, func in ENGINES.items():
+            grids[name], seconds, peak = measure(func, path, args.repeat)
+            totals[name][0] += seconds
+            totals[name][1] = max(totals[name][1], peak)
+            print(f"{os.path.basename(path):<30} {name:<10} {seconds:>10.4f} {peak / 2 ** 20:>10.2f}")
+        pd.testing.assert_frame_equal(grids["openpyxl"], grids["stream"])
+
+    print()
+    for name, (seconds, peak) in totals.items():
+        print(f"{name:<10} total {seconds:.4f}s  {len(files) / seconds:.1f} files/s  max peak {peak / 2 ** 20:.2f} MiB")
+    print(f"speedup {totals['openpyxl'][0] / totals['stream'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark export-button / csrf-token extraction on saved HTML pages.
+
+    python benchmarks/bench_html_extract.py
+    python benchmarks/bench_html_extract.py --fixtures saved_pages/ --repeat 20
+
+Every *.html file in --fixtures is a fixture; company pages (anything with an
+"Export to Excel" button) are searched for the button, login pages for the
+csrfmiddlewaretoken input. Without --fixtures, synthetic pages shaped like
+screener.in company pages (button in the page header, then the result
+tables) are written under --workdir first, plus one with the button moved
+to the end of the page as the worst case for the streaming scan, and one
+without the button at all, which the scan hands to the BeautifulSoup
+fallback.
+
+For each page three ways of getting the attributes are timed:
+
+    soup      BeautifulSoup(page, "html.parser").find(...)   (previous code path)
+    scan      config.html_extract.find_tag over the whole page
+    stream    find_tag over 16 KiB chunks, stopping at the match
+
+and all three must agree.
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from config.html_extract import CSRF_INPUT, EXPORT_BUTTON, find_tag  # noqa: E402
+
+CHUNK_SIZE = 16384
+
+SECTIONS = ["quarters", "profit-loss", "balance-sheet", "cash-flow", "ratios", "shareholding"]
+
+
+def company_page(symbol, rows=40, years=12, button_at_end=False, button=True, seed=0):
+    """Synthetic company page: scripts and styles, header with ratios and the export form, then tables."""
+    rng = random.Random(seed)
+    form = (f'<form method="post" class="flex"><input type="hidden" name="next" value="/company/{symbol}/">'
+            f'<button class="button-small button-secondary plausible-event-name=Excel+Export" '
+            f'data-tooltip="Download > 10 years" '
+            f'formaction="/user/company/export/{symbol}/" aria-label="Export to Excel">'
+            f'<i class="icon-download"></i><span>Export to Excel</span></button></form>') if button else ""
+    parts = [
+        "<!DOCTYPE html><html lang='en'><head><meta charset='utf-8'>",
+        f"<title>{symbol} share price | About {symbol} | Key Insights - Screener</title>",
+        *(f'<link rel="stylesheet" href="/static/css/{i}.css"><script src="/static/js/{i}.js" defer></script>'
+          for i in range(12)),
+        "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>",
+        "</head><body><nav class='u-full-width'>",
+        *(f"<a href='/explore/{i}/'>Link {i}</a>" for i in range(30)),
+        f"</nav><main><div id='top' class='card'><h1 class='margin-0'>{symbol} Ltd</h1>",
+        "<ul id='top-ratios'>",
+        *(f"<li class='flex'><span class='name'>Ratio {i}</span><span class='number'>{rng.uniform(0, 1e4):,.2f}"
+          f"</span></li>" for i in range(10)),
+        "</ul>",
+    ]
+    if not button_at_end:
+        parts.append(form)
+    parts.append("</div>")
+    for section in SECTIONS:
+        parts.append(f"<section id='{section}' class='card'><h2>{section}</h2><div class='responsive-holder'>"
+                     "<table class='data-table'><thead><tr><th></th>")
+        parts.extend(f"<th>Mar {2012 + y}</th>" for y in range(years))
+        parts.append("</tr></thead><tbody>")
+        for r in range(rows):
+            parts.append(f"<tr class='stripe'><td class='text'><button class='button-plain' "
+                         f"onclick=\"Company.showSchedule('{section}', {r}, this)\">Metric {r}&nbsp;+</button></td>")
+            parts.extend(f"<td>{rng.uniform(-1e5, 1e6):,.0f}</td>" for _ in range(years))
+            parts.append("</tr>")
+        parts.append("</tbody></table></div></section>")
+    if button_at_end:
+        parts.append(form)
+    parts.append("</main><footer>" + "<p>footer</p>" * 20 + "</footer></body></html>")
+    return "\n".join(parts).encode()
+
+
+def login_page():
+    return (b"<!DOCTYPE html><html><head><title>Login - Screener</title></head><body>"
+            b"<form method='post' action='/login/'>"
+            b"<input type='hidden' name='csrfmiddlewaretoken' "
+            b"value='Xy7Lq0pN3vB8mZ2kR5tW9cF1gH4jD6sA0eU3iO8yT2rE5wQ1'>"
+            b"<input type='email' name='username'><input type='password' name='password'>"
+            b"<button type='submit'>Login</button></form></body></html>")
+
+
+def write_fixtures(workdir, rows):
+    os.makedirs(workdir, exist_ok=True)
+    pages = {
+        "login.html": login_page(),
+        "company_small.html": company_page("SMALL", rows=10, seed=1),
+        "company_large.html": company_page("LARGE", rows=rows, seed=2),
+        "company_button_last.html": company_page("LAST", rows=rows, button_at_end=True, seed=3),
+        "company_no_button.html": company_page("NONE", rows=rows, button=False, seed=4),
+    }
+    for name, body in pages.items():
+        with open(os.path.join(workdir, name), "wb") as f:
+            f.write(body)
+    return sorted(os.path.join(workdir, name) for name in pages)
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directory of saved *.html pages")
+    parser.add_argument("--rows", type=int, default=200, help="table rows per section in synthetic pages")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per page; the best is kept")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "screener-bench-html"))
+    args = parser.parse_args()
+
+    if args.fixtures:
+        paths = sorted(glob.glob(os.path.join(args.fixtures, "*.html")))
+        if not paths:
+            sys.exit(f"no *.html fixtures in {args.fixtures}")
+    else:
+        paths = write_fixtures(args.workdir, args.rows)
+
+    print(f"{'page':<28} {'KiB':>8} {'soup ms':>9} {'scan ms':>9} {'stream ms':>10} {'speedup':>8}")
+    mismatches = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            body = f.read()
+        target = CSRF_INPUT if b"csrfmiddlewaretoken" in body else EXPORT_BUTTON
+        tag, attrs = target
+
+        def soup():
+            element = BeautifulSoup(body, "html.parser").find(tag, attrs=attrs)
+            return dict(element.attrs) if element is not None else None
+
+        def stream():
+            chunks = (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+            return find_tag(chunks, tag, attrs)
+
+        soup_s, expected = best_of(args.repeat, soup)
+        scan_s, scanned = best_of(args.repeat, lambda: find_tag([body], tag, attrs))
+        stream_s, streamed = best_of(args.repeat, stream)
+
+        # BeautifulSoup keeps multi-valued attributes (class) as lists; compare the ones that matter
+        key = "formaction" if target is EXPORT_BUTTON else "value"
+        found = [r.get(key) if r is not None else None for r in (expected, scanned, streamed)]
+        if len(set(found)) != 1:
+            mismatches += 1
+            print(f"MISMATCH {os.path.basename(path)}: soup={expected} scan={scanned} stream={streamed}")
+
+        print(f"{os.path.basename(path):<28} {len(body) / 1024:>8.1f} {soup_s * 1000:>9.3f} {scan_s * 1000:>9.3f} "
+              f"{stream_s * 1000:>10.3f} {soup_s / stream_s:>7.0f}x")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
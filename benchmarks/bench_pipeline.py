@@ -0,0 +1,209 @@
+"""
+Benchmark the parse / transform pipeline on synthetic exports.
+
+    python benchmarks/bench_pipeline.py --scales 1 100 5000
+    python benchmarks/bench_pipeline.py --output baseline.json
+    python benchmarks/bench_pipeline.py --output new.json --compare baseline.json
+
+Synthetic workbooks (benchmarks/synthetic.py) are generated once per
+--years / --quarters / --metrics combination under --workdir and reused. Each
+scale runs in a fresh process so its peak RSS is its own. For every symbol the
+pipeline is run stage by stage, with each stage timed separately:
+
+    read_data_sheet   the raw "Data Sheet" grid (config.xlsx_reader)
+    parse_section     all four sections (parse_sections)
+    combine           combine_typed, annual + quarterly
+    melt_combined     concat + melt_combined_vectorized
+    calculate_trends  on the annual combined frame
+    end_to_end        the five stages above, back to back
+
+A second pass times the public Screener.read_excel on its own. Results are
+written as JSON to --output (by default under the temp directory, next to
+the workbooks). With --compare, any stage whose throughput drops, or any
+scale whose peak RSS grows, by more than --tolerance counts as a regression
+and the exit status is 1.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import STANDARD_METRICS, generate_exports  # noqa: E402
+
+STAGES = ["read_data_sheet", "parse_section", "combine", "melt_combined", "calculate_trends", "end_to_end",
+          "read_excel"]
+
+
+def _peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def run_scale(files, repeat):
+    """Runs in a fresh process: time every stage over `files`; best of `repeat` passes."""
+    import logging
+
+    import pandas as pd
+
+    from config.utils import calculate_trends, parse_sections
+    from config.xlsx_reader import read_data_sheet
+    from screener import Screener
+
+    logging.getLogger().setLevel(logging.WARNING)
+    screener = Screener(symbol_cache=False, report_store=False)
+    rss_before = _peak_rss_mib()
+
+    best = {stage: float("inf") for stage in STAGES}
+    rows = 0
+    for _ in range(repeat):
+        seconds = dict.fromkeys(STAGES, 0.0)
+        rows = 0
+        for path, symbol in files:
+            t0 = time.perf_counter()
+            grid = read_data_sheet(path, sheet_name="Data Sheet")
+            t1 = time.perf_counter()
+            sections = parse_sections(grid)
+            t2 = time.perf_counter()
+            annual = screener.combine_typed(
+                {name: sections[name] for name in ("pnl", "balance", "cashflow")}, period_code="A")
+            quarterly = screener.combine_typed({"quarters": sections["quarters"]}, period_code="Q")
+            t3 = time.perf_counter()
+            timeseries = screener.melt_combined_vectorized(pd.concat([annual, quarterly], axis=1), symbol)
+            t4 = time.perf_counter()
+            calculate_trends(annual)
+            t5 = time.perf_counter()
+
+            seconds["read_data_sheet"] += t1 - t0
+            seconds["parse_section"] += t2 - t1
+            seconds["combine"] += t3 - t2
+            seconds["melt_combined"] += t4 - t3
+            seconds["calculate_trends"] += t5 - t4
+            seconds["end_to_end"] += t5 - t0
+            rows += len(timeseries)
+
+        start = time.perf_counter()
+        for path, symbol in files:
+            screener.read_excel(path, symbol)
+        seconds["read_excel"] = time.perf_counter() - start
+
+        best = {stage: min(best[stage], seconds[stage]) for stage in STAGES}
+
+    stages = {}
+    for stage, total in best.items():
+        stages[stage] = {
+            "seconds": round(total, 6),
+            "ms_per_symbol": round(total / len(files) * 1000, 4),
+            "symbols_per_sec": round(len(files) / total, 2) if total else None,
+            "rows_per_sec": round(rows / total, 1) if total else None,
+        }
+    return {
+        "symbols": len(files),
+        "rows": rows,
+        "stages": stages,
+        "rss_before_mib": round(rss_before, 1),
+        "peak_rss_mib": round(_peak_rss_mib(), 1),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for results against a baseline run with the same parameters."""
+    previous = {r["symbols"]: r for r in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        old = previous.get(result["symbols"])
+        if old is None:
+            continue
+        for stage, stats in result["stages"].items():
+            before = old["stages"].get(stage, {}).get("symbols_per_sec")
+            now = stats["symbols_per_sec"]
+            if before and now and now < before * (1 - tolerance):
+                regressions.append(f"{result['symbols']} symbols / {stage}: {now} symbols/s, was {before}")
+        if result["peak_rss_mib"] > old["peak_rss_mib"] * (1 + tolerance):
+            regressions.append(f"{result['symbols']} symbols: peak RSS {result['peak_rss_mib']} MiB, "
+                               f"was {old['peak_rss_mib']}")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100, 5000], help="numbers of symbols")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--quarters", type=int, default=10)
+    parser.add_argument("--metrics", type=int, default=STANDARD_METRICS)
+    parser.add_argument("--repeat", type=int, default=1, help="passes per scale; the best is kept")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "screener-bench"))
+    parser.add_argument("--output", default=os.path.join(tempfile.gettempdir(), "screener-bench-pipeline.json"))
+    parser.add_argument("--compare", help="earlier results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown / RSS growth")
+    args = parser.parse_args()
+
+    import numpy as np
+    import pandas as pd
+
+    files = generate_exports(args.workdir, max(args.scales), args.years, args.quarters, args.metrics)
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {"years": args.years, "quarters": args.quarters, "metrics": args.metrics,
+                       "repeat": args.repeat},
+        },
+        "results": [],
+    }
+
+    print(f"{'symbols':>8} {'stage':<18} {'seconds':>10} {'ms/symbol':>10} {'symbols/s':>10} {'rows/s':>12}")
+    context = multiprocessing.get_context("spawn")
+    for scale in args.scales:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_scale, files[:scale], args.repeat).result()
+        results["results"].append(result)
+        for stage, stats in result["stages"].items():
+            print(f"{scale:>8} {stage:<18} {stats['seconds']:>10.4f} {stats['ms_per_symbol']:>10.3f} "
+                  f"{stats['symbols_per_sec']:>10.1f} {stats['rows_per_sec']:>12.0f}")
+        print(f"{scale:>8} peak RSS {result['peak_rss_mib']:.1f} MiB (after imports {result['rss_before_mib']:.1f})")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["params"] != results["meta"]["params"]:
+            print("warning: baseline was run with different parameters", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
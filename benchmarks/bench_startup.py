@@ -0,0 +1,103 @@
+"""
+Startup-time budget for the API server and the batch CLI, from python -X importtime.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --budget api=400
+
+Each target module is imported in a fresh interpreter with -X importtime. Its
+cumulative import time (best of --repeat) must stay within the budget, and
+none of the modules it defers to first use may be loaded at import time:
+
+    api       import app       uvicorn worker startup; pandas, pyarrow and the
+                               HTTP clients load in the lifespan, off the loop
+    ingest    import ingest    batch CLI; pandas loads in the worker processes
+    screener  import screener  parse-only callers; requests / bs4 load on the
+                               first fetch
+
+The budgets are for a warm bytecode cache on a typical dev machine; pass
+--budget NAME=MS to adjust. Exit status is 1 when any target is over budget
+or imports a deferred module.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (module, budget in ms, modules that must not be imported yet)
+TARGETS = {
+    "api": ("app", 600, ["pandas", "numpy", "pyarrow", "httpx", "requests", "bs4", "screener"]),
+    "ingest": ("ingest", 100, ["pandas", "numpy", "pyarrow", "requests", "bs4", "screener"]),
+    "screener": ("screener", 800, ["requests", "bs4", "httpx", "fastapi"]),
+}
+
+
+def import_profile(module):
+    """
+    From one fresh interpreter: (cumulative import time of module in ms,
+    {every imported module: ms}, {the modules it imports directly: ms}).
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    imported = {}
+    children = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        imported[name] = int(cumulative) / 1000
+        # importtime prints a module after everything it imported; the target's direct imports
+        # are the depth-1 lines right before it
+        if depth == 0 and name != module:
+            children = {}
+        elif depth == 1:
+            children[name] = int(cumulative) / 1000
+    return imported[module], imported, children
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=list(TARGETS), help=f"any of {', '.join(TARGETS)}")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target; the best is kept")
+    parser.add_argument("--budget", action="append", default=[], metavar="NAME=MS", help="override a budget")
+    parser.add_argument("--top", type=int, default=5, help="slowest direct imports shown per target")
+    args = parser.parse_args()
+
+    budgets = {name: budget for name, (_, budget, _) in TARGETS.items()}
+    for override in args.budget:
+        name, _, ms = override.partition("=")
+        if name not in TARGETS:
+            parser.error(f"unknown target {name}")
+        budgets[name] = float(ms)
+
+    failures = []
+    for name in args.targets:
+        module, _, deferred = TARGETS[name]
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        best, imported, children = min(runs, key=lambda run: run[0])
+        status = "ok" if best <= budgets[name] else "OVER BUDGET"
+        print(f"{name:<10} import {module:<10} {best:8.1f} ms  (budget {budgets[name]:.0f} ms)  {status}")
+        for child, ms in sorted(children.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{'':<12}{child:<40} {ms:8.1f} ms")
+        if best > budgets[name]:
+            failures.append(f"{name}: {best:.1f} ms > {budgets[name]:.0f} ms")
+        loaded = [m for m in deferred if m in imported]
+        if loaded:
+            failures.append(f"{name}: import {module} loads {', '.join(loaded)}")
+
+    for message in failures:
+        print(f"FAIL {message}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
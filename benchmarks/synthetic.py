@@ -0,0 +1,190 @@
+"""
+Synthetic Screener-format export workbooks for benchmarks.
+
+    grid = data_sheet_grid(years=10, quarters=10, metrics=60, seed=7)
+    write_workbook("export_SYN7.xlsx", grid)
+
+data_sheet_grid lays out the "Data Sheet" the way a screener.in export does
+(P&L, Quarters, Balance Sheet, Cash Flow, Price and the derived share count),
+with deterministic random values per seed. `metrics` is the total number of
+line items across the four sections; anything above the standard 44 is added
+as extra P&L lines. write_workbook writes the grid as a minimal .xlsx (inline
+strings, dates styled with a built-in date format) straight through zipfile,
+several times faster than openpyxl and reading back identically with both
+pd.read_excel and config.xlsx_reader.
+"""
+import os
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+PNL_ITEMS = [
+    "Sales", "Raw Material Cost", "Change in Inventory", "Power and Fuel", "Other Mfr. Exp", "Employee Cost",
+    "Selling and admin", "Other Expenses", "Other Income", "Depreciation", "Interest", "Profit before tax", "Tax",
+    "Net profit", "Dividend Amount",
+]
+QUARTER_ITEMS = [
+    "Sales", "Expenses", "Other Income", "Depreciation", "Interest", "Profit before tax", "Tax", "Net profit",
+    "Operating Profit",
+]
+BALANCE_ITEMS = [
+    "Equity Share Capital", "Reserves", "Borrowings", "Other Liabilities", "Total", "Net Block",
+    "Capital Work in Progress", "Investments", "Other Assets", "Total", "Receivables", "Inventory", "Cash & Bank",
+    "No. of Equity Shares", "New Bonus Shares", "Face value",
+]
+CASHFLOW_ITEMS = [
+    "Cash from Operating Activity", "Cash from Investing Activity", "Cash from Financing Activity", "Net Cash Flow",
+]
+STANDARD_METRICS = len(PNL_ITEMS) + len(QUARTER_ITEMS) + len(BALANCE_ITEMS) + len(CASHFLOW_ITEMS)
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+def data_sheet_grid(years=10, quarters=10, metrics=STANDARD_METRICS, seed=0, company="SYNTHETIC LTD"):
+    """Raw "Data Sheet" grid, as pd.read_excel(header=None) would return it."""
+    rng = np.random.default_rng(seed)
+    width = 1 + max(years, quarters)
+    rows = []
+
+    def row(*values):
+        rows.append(list(values) + [None] * (width - len(values)))
+
+    annual = [datetime(2025 - years + i, 3, 31) for i in range(1, years + 1)]
+    quarter_ends = pd.date_range(end="2025-06-30", periods=quarters, freq="QE")
+    quarterly = [d.to_pydatetime() for d in quarter_ends]
+
+    def section(title, items, dates, low=1.0, high=1e5):
+        row(title)
+        row("Report Date", *dates)
+        for item in items:
+            row(item, *np.round(rng.uniform(low, high, len(dates))))
+        row(None)
+
+    pnl = PNL_ITEMS + [f"Other Item {i + 1}" for i in range(max(0, metrics - STANDARD_METRICS))]
+    row("COMPANY NAME", company)
+    row(None)
+    row("META")
+    section("PROFIT & LOSS", pnl, annual)
+    section("Quarters", QUARTER_ITEMS, quarterly)
+    section("BALANCE SHEET", BALANCE_ITEMS, annual)
+    row("CASH FLOW:")
+    row("Report Date", *annual)
+    for item in CASHFLOW_ITEMS:
+        row(item, *np.round(rng.uniform(-1e4, 1e4, years), 2))
+    row(None)
+    row("PRICE:", *np.round(rng.uniform(100, 3000, years), 2))
+    row(None)
+    row("DERIVED:")
+    row("Adjusted Equity Shares in Cr", *np.round(rng.uniform(10, 500, years), 2))
+    return pd.DataFrame(rows)
+
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell(ref, value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    if isinstance(value, str):
+        return f'<c r="{ref}" t="inlineStr"><is><t>{escape(value)}</t></is></c>'
+    if isinstance(value, datetime):
+        serial = (value - EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c r="{ref}" s="1"><v>{serial:g}</v></c>'
+    return f'<c r="{ref}"><v>{float(value)!r}</v></c>'
+
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '<Relationship Id="rId2" Target="styles.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+    '</Relationships>'
+)
+# cellXfs 0: general, 1: built-in date format 14
+STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '</styleSheet>'
+)
+
+
+def write_workbook(path, grid: pd.DataFrame, sheet_name="Data Sheet"):
+    letters = [_column_letter(i) for i in range(grid.shape[1])]
+    rows = []
+    for r, values in enumerate(grid.itertuples(index=False), start=1):
+        cells = "".join(_cell(f"{letters[c]}{r}", value) for c, value in enumerate(values))
+        rows.append(f'<row r="{r}">{cells}</row>')
+    sheet = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f'<sheetData>{"".join(rows)}</sheetData></worksheet>'
+    )
+    tmp_path = f"{path}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", CONTENT_TYPES)
+        zf.writestr("_rels/.rels", ROOT_RELS)
+        zf.writestr("xl/workbook.xml", WORKBOOK.format(sheet_name=escape(sheet_name, {'"': "&quot;"})))
+        zf.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", STYLES)
+        zf.writestr("xl/worksheets/sheet1.xml", sheet)
+    os.replace(tmp_path, path)
+
+
+def generate_exports(directory, count, years=10, quarters=10, metrics=STANDARD_METRICS):
+    """
+    export_SYN<i>.xlsx for i in range(count), seeded by i, reusing files that
+    already exist for the same parameters. Returns [(path, symbol)].
+    """
+    directory = os.path.join(directory, f"y{years}-q{quarters}-m{metrics}")
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for i in range(count):
+        symbol = f"SYN{i}"
+        path = os.path.join(directory, f"export_{symbol}.xlsx")
+        if not os.path.exists(path):
+            write_workbook(path, data_sheet_grid(years, quarters, metrics, seed=i, company=f"{symbol} LTD"))
+        files.append((path, symbol))
+    return files
@@ -0,0 +1,188 @@
+from collections import namedtuple
+
+import numpy as np
+
+from config.logger import logger
+
+Metric = namedtuple("Metric", ["name", "inputs", "formula", "period_code"])
+
+
+class MetricRegistry:
+    """
+    Declarative registry of derived metrics. Each metric names its input
+    columns (wide combined columns or other metrics) and a formula
+    `formula(out, *inputs)` that writes the result into the preallocated
+    array `out`.
+
+        @DERIVED_METRICS.metric("net_margin", ["net profit_pnl", "sales_pnl"])
+        def net_margin(out, net_profit, sales):
+            guarded_ratio(out, net_profit, sales, sales > 0, scale=100, decimals=[2])
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def metric(self, name, inputs, period_code="A"):
+        def register(formula):
+            self.add(Metric(name, tuple(inputs), formula, period_code))
+            return formula
+        return register
+
+    def add(self, metric: Metric):
+        self._metrics[metric.name] = metric
+
+    def __contains__(self, name):
+        return name in self._metrics
+
+    def __getitem__(self, name):
+        return self._metrics[name]
+
+    def names(self, period_code=None):
+        """Registered metric names in registration order."""
+        return [m.name for m in self._metrics.values() if period_code is None or m.period_code == period_code]
+
+    def resolve(self, names):
+        """
+        Requested metrics plus every derived metric they depend on, in
+        dependency order. Raises ValueError on a dependency cycle.
+        """
+        ordered = []
+        state = {}
+
+        def visit(name, path):
+            if name not in self._metrics or state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Derived metric cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dependency in self._metrics[name].inputs:
+                visit(dependency, path + [name])
+            state[name] = "done"
+            ordered.append(name)
+
+        for name in names:
+            visit(name, [])
+        return ordered
+
+
+class MetricEvaluator:
+    """
+    Lazily computes derived metrics for one symbol's combined columns and
+    memoizes them. get() evaluates a metric's inputs first (dependency
+    order) and returns None, instead of raising, when a source column is
+    missing. `allocate(name, like)` supplies the output array, so callers
+    can have results written straight into a preallocated block.
+    """
+
+    def __init__(self, registry, columns, allocate=None):
+        self.registry = registry
+        self.columns = columns
+        self.allocate = allocate or (lambda name, like: np.empty_like(like, dtype="float64"))
+        self.cache = {}
+
+    def get(self, name):
+        if name in self.cache:
+            return self.cache[name]
+        if name in self.columns:
+            return self.columns[name]
+        if name not in self.registry:
+            return None
+
+        metric = self.registry[name]
+        inputs = [self.get(dependency) for dependency in metric.inputs]
+        missing = [dependency for dependency, value in zip(metric.inputs, inputs) if value is None]
+        if missing:
+            logger.warning(f"Skipping derived metric {name}: missing {missing}")
+            self.cache[name] = None
+            return None
+
+        out = self.allocate(name, inputs[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            metric.formula(out, *inputs)
+        self.cache[name] = out
+        return out
+
+    def compute(self, names):
+        """{name: array} for the requested metrics that could be computed."""
+        results = {}
+        for name in self.registry.resolve(names):
+            value = self.get(name)
+            if value is not None and name in names:
+                results[name] = value
+        return results
+
+
+def guarded_ratio(out, numerator, denominator, condition, scale=None, decimals=()):
+    """out = round(numerator / denominator * scale) where condition holds, else 0 (in place)."""
+    np.divide(numerator, denominator, out=out)
+    if scale is not None:
+        out *= scale
+    for d in decimals:
+        np.round(out, d, out=out)
+    out[~condition] = 0
+
+
+DERIVED_METRICS = MetricRegistry()
+
+
+@DERIVED_METRICS.metric("expenses_pnl", [
+    "raw material cost_pnl", "power and fuel_pnl", "other mfr. exp_pnl", "employee cost_pnl",
+    "selling and admin_pnl", "other expenses_pnl", "change in inventory_pnl",
+])
+def expenses(out, raw_material, power_and_fuel, other_mfr, employee, selling_admin, other_expenses,
+             change_in_inventory):
+    np.add(raw_material, power_and_fuel, out=out)
+    for value in (other_mfr, employee, selling_admin, other_expenses):
+        out += value
+    out -= change_in_inventory
+
+
+@DERIVED_METRICS.metric("operating_profit_pnl", ["sales_pnl", "expenses_pnl"])
+def operating_profit(out, sales, expenses):
+    np.subtract(sales, expenses, out=out)
+
+
+@DERIVED_METRICS.metric("dividend_payout_pnl", ["dividend amount_pnl", "net profit_pnl"])
+def dividend_payout(out, dividend, net_profit):
+    guarded_ratio(out, dividend, net_profit, net_profit > 0, scale=100, decimals=[2])
+
+
+@DERIVED_METRICS.metric("EPS", ["net profit_pnl", "adjusted equity shares in cr_cashflow"])
+def eps(out, net_profit, shares):
+    guarded_ratio(out, net_profit, shares, shares > 0, decimals=[2])
+
+
+@DERIVED_METRICS.metric("yearly OPM", ["operating_profit_pnl", "sales_pnl"])
+def yearly_opm(out, operating_profit, sales):
+    guarded_ratio(out, operating_profit, sales, operating_profit > 0, scale=100, decimals=[2, 0])
+
+
+@DERIVED_METRICS.metric("ROE", ["net profit_pnl", "equity share capital_balance", "reserves_balance"])
+def roe(out, net_profit, equity_capital, reserves):
+    equity = equity_capital + reserves
+    guarded_ratio(out, net_profit, equity, equity > 0, scale=100, decimals=[2, 0])
+
+
+@DERIVED_METRICS.metric("price_to_earning", ["price", "EPS"])
+def price_to_earning(out, price, eps):
+    guarded_ratio(out, price, eps, eps > 0, decimals=[2])
+
+
+@DERIVED_METRICS.metric("working_capital", ["other assets_balance", "other liabilities_balance"])
+def working_capital(out, other_assets, other_liabilities):
+    np.subtract(other_assets, other_liabilities, out=out)
+
+
+@DERIVED_METRICS.metric("debtor_days", ["receivables_balance", "sales_pnl"])
+def debtor_days(out, receivables, sales):
+    guarded_ratio(out, receivables, sales / 365, sales > 0, decimals=[2])
+
+
+@DERIVED_METRICS.metric("inventory_turnover", ["sales_pnl", "inventory_balance"])
+def inventory_turnover(out, sales, inventory):
+    guarded_ratio(out, sales, inventory, inventory > 0, decimals=[2])
+
+
+@DERIVED_METRICS.metric("quarterly OPM_quarters", ["operating profit_quarters", "sales_quarters"], period_code="Q")
+def quarterly_opm(out, operating_profit, sales):
+    guarded_ratio(out, operating_profit, sales, sales > 0, scale=100, decimals=[0])
@@ -0,0 +1,97 @@
+import html
+import re
+
+from config.metrics import METRICS
+
+EXPORT_BUTTON = ("button", {"aria-label": "Export to Excel"})
+CSRF_INPUT = ("input", {"name": "csrfmiddlewaretoken"})
+
+ATTR_RE = re.compile(rb"""([^\s"'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+
+
+def parse_attrs(raw: bytes) -> dict:
+    """Attributes of a start tag (the bytes between the tag name and ">"), names lower-cased."""
+    attrs = {}
+    for m in ATTR_RE.finditer(raw):
+        name = m.group(1).decode("ascii", "replace").lower()
+        value = next((v for v in m.group(2, 3, 4) if v is not None), b"")
+        attrs.setdefault(name, html.unescape(value.decode("utf-8", "replace")))
+    return attrs
+
+
+class TagScanner:
+    """
+    Finds the first <tag ...> whose attributes include `attrs` in HTML fed
+    as byte chunks, without building a document tree:
+
+        scanner = TagScanner("button", {"aria-label": "Export to Excel"})
+        for chunk in chunks:
+            if scanner.feed(chunk) is not None:
+                break
+
+    Only start tags are looked at, so a match inside a comment or script
+    counts too; callers fall back to a real parser when nothing matches.
+    """
+
+    def __init__(self, tag, attrs):
+        self.attrs = attrs
+        self.result = None
+        # quoted attribute values may contain ">"
+        self._tag_re = re.compile(
+            rb"<" + re.escape(tag.encode()) + rb"""(?=[\s/>])((?:[^>"']|"[^"]*"|'[^']*')*)>""", re.I)
+        self._tail = b""
+
+    def feed(self, chunk: bytes):
+        """Attributes of the matching tag once it has been seen, else None."""
+        if self.result is not None:
+            return self.result
+        data = self._tail + chunk
+        end = 0
+        for m in self._tag_re.finditer(data):
+            end = m.end()
+            attrs = parse_attrs(m.group(1))
+            if all(attrs.get(name) == value for name, value in self.attrs.items()):
+                self.result = attrs
+                return attrs
+        # a tag may straddle the chunk boundary: keep it for the next feed
+        start = data.rfind(b"<", end)
+        self._tail = data[start:] if start != -1 else b""
+        return None
+
+
+def _soup_find(body: bytes, tag, attrs):
+    from bs4 import BeautifulSoup
+
+    element = BeautifulSoup(body, "html.parser").find(tag, attrs=attrs)
+    return dict(element.attrs) if element is not None else None
+
+
+def find_tag(chunks, tag, attrs):
+    """
+    Attributes of the first <tag> matching attrs in an iterable of HTML byte
+    chunks, or None. Iteration stops at the match, so with a streamed response
+    the rest of the body is never scanned; if the fast scan finds nothing the
+    whole body goes through BeautifulSoup instead.
+    """
+    scanner = TagScanner(tag, attrs)
+    seen = []
+    for chunk in chunks:
+        seen.append(chunk)
+        if scanner.feed(chunk) is not None:
+            METRICS.inc("screener_html_extract_total", tag=tag, path="fast")
+            return scanner.result
+    METRICS.inc("screener_html_extract_total", tag=tag, path="fallback")
+    return _soup_find(b"".join(seen), tag, attrs)
+
+
+async def afind_tag(chunks, tag, attrs):
+    """find_tag for an async iterable of chunks (httpx aiter_bytes)."""
+    scanner = TagScanner(tag, attrs)
+    seen = []
+    async for chunk in chunks:
+        seen.append(chunk)
+        if scanner.feed(chunk) is not None:
+            METRICS.inc("screener_html_extract_total", tag=tag, path="fast")
+            return scanner.result
+    METRICS.inc("screener_html_extract_total", tag=tag, path="fallback")
+    return _soup_find(b"".join(seen), tag, attrs)
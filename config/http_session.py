@@ -0,0 +1,16 @@
+import threading
+
+import requests
+
+
+class ScreenerSession(requests.Session):
+    """
+    requests.Session plus the per-login state Screener needs: the
+    CookieJarStore its cookies are persisted to (None keeps them in memory
+    only) and the lock that keeps concurrent callers from logging it in twice.
+    """
+
+    def __init__(self, cookie_store=None):
+        super().__init__()
+        self.cookie_store = cookie_store
+        self.login_lock = threading.Lock()
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from config.logger import logger
+
+# item states; a job is "done" once every item is ok or failed
+PENDING, RUNNING, OK, FAILED = "pending", "running", "ok", "failed"
+
+
+class JobStore:
+    """
+    SQLite record of batch jobs and their per-symbol items, so progress and
+    results survive a server restart.
+    """
+
+    def __init__(self, path="cache/jobs.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, created_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            "job_id TEXT NOT NULL, position INTEGER NOT NULL, symbol TEXT NOT NULL, status TEXT NOT NULL, "
+            "rows INTEGER, error TEXT, seconds REAL, PRIMARY KEY (job_id, symbol))"
+        )
+
+    def create(self, symbols):
+        """New job over the (deduplicated, upper-cased) symbols; returns (job_id, symbols)."""
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        if not symbols:
+            raise ValueError("A job needs at least one non-blank symbol")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("INSERT INTO jobs (id, created_at, updated_at, finished_at) VALUES (?, ?, ?, ?)",
+                               (job_id, now, now, None))
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, position, symbol, status) VALUES (?, ?, ?, ?)",
+                [(job_id, i, symbol, PENDING) for i, symbol in enumerate(symbols)],
+            )
+            self._conn.execute("COMMIT")
+        return job_id, symbols
+
+    def update(self, job_id, symbol, status, rows=None, error=None, seconds=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "UPDATE job_items SET status = ?, rows = ?, error = ?, seconds = ? WHERE job_id = ? AND symbol = ?",
+                (status, rows, error, seconds, job_id, symbol),
+            )
+            open_items = self._conn.execute(
+                "SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status IN (?, ?)", (job_id, PENDING, RUNNING)
+            ).fetchone()[0]
+            self._conn.execute(
+                "UPDATE jobs SET updated_at = ?, finished_at = ? WHERE id = ?",
+                (now, now if open_items == 0 else None, job_id),
+            )
+            self._conn.execute("COMMIT")
+
+    def get(self, job_id, items=True):
+        """Job summary ({id, status, total, counts, ...}, plus items when asked) or None."""
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT created_at, updated_at, finished_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT symbol, status, rows, error, seconds FROM job_items WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+
+        counts = {state: 0 for state in (PENDING, RUNNING, OK, FAILED)}
+        for row in rows:
+            counts[row[1]] += 1
+        if job[2] is not None:
+            status = "done"
+        elif counts[PENDING] == len(rows):
+            status = "queued"
+        else:
+            status = "running"
+        result = {
+            "job_id": job_id, "status": status, "total": len(rows), "counts": counts,
+            "created_at": job[0], "updated_at": job[1], "finished_at": job[2],
+        }
+        if items:
+            result["items"] = [
+                dict(zip(("symbol", "status", "rows", "error", "seconds"), row)) for row in rows
+            ]
+        return result
+
+    def unfinished(self):
+        """(job_id, symbol) of every item not yet ok / failed, oldest job first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT i.job_id, i.symbol FROM job_items i JOIN jobs j ON j.id = i.job_id "
+                "WHERE i.status IN (?, ?) ORDER BY j.created_at, i.position",
+                (PENDING, RUNNING),
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    """
+    Bounded asyncio worker pool draining batch job items.
+
+    `process(symbol)` is awaited for each item and returns its row count; an
+    exception marks the item failed without affecting the rest of the job.
+    start() re-queues whatever a previous process left unfinished.
+    """
+
+    def __init__(self, store: JobStore, process, workers=4):
+        self.store = store
+        self.process = process
+        self.workers = workers
+        self._queue = None
+        self._tasks = []
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        resumed = self.store.unfinished()
+        for item in resumed:
+            self._queue.put_nowait(item)
+        if resumed:
+            logger.info(f"Resuming {len(resumed)} unfinished job items")
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self):
+        pending = set(self._tasks)
+        while pending:
+            # cancel again until they exit: a cancellation delivered while httpcore is closing a
+            # connection (inside its shielded cleanup) can be absorbed, and the worker would then
+            # carry on to the next queue.get() and wait there forever
+            for task in pending:
+                task.cancel()
+            _, pending = await asyncio.wait(pending, timeout=1)
+        self._tasks = []
+
+    def submit(self, symbols):
+        job_id, symbols = self.store.create(symbols)
+        for symbol in symbols:
+            self._queue.put_nowait((job_id, symbol))
+        logger.info(f"Job {job_id}: {len(symbols)} symbols queued")
+        return job_id
+
+    async def _work(self):
+        while True:
+            job_id, symbol = await self._queue.get()
+            try:
+                self.store.update(job_id, symbol, RUNNING)
+                start = time.perf_counter()
+                try:
+                    rows = await self.process(symbol)
+                    self.store.update(job_id, symbol, OK, rows=rows, seconds=time.perf_counter() - start)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Job {job_id}: {symbol} failed: {e}")
+                    self.store.update(job_id, symbol, FAILED, error=str(e), seconds=time.perf_counter() - start)
+            finally:
+                self._queue.task_done()
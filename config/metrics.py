@@ -0,0 +1,206 @@
+import bisect
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+from config.logger import logger
+
+# seconds; the last bucket is +Inf
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Span:
+    """Handed out by MetricsRegistry.timer; set bytes / rows while the stage runs."""
+
+    __slots__ = ("stage", "labels", "bytes", "rows")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+        self.bytes = 0
+        self.rows = None
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms, keyed by name and a sorted label tuple.
+
+        with METRICS.timer("parse_section", section="pnl") as span:
+            span.rows = len(parsed)
+
+    timer() records screener_stage_seconds{stage, ...labels} and adds the
+    span's bytes, rows and failures to screener_stage_{bytes,rows,errors}_total.
+    Keep labels low-cardinality (no symbols).
+    render() gives the Prometheus text exposition format.
+    """
+
+    def __init__(self, prefix="screener"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        span = Span(stage, labels)
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield span
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe(f"{self.prefix}_stage_seconds", seconds, stage=stage, **labels)
+            if span.bytes:
+                self.inc(f"{self.prefix}_stage_bytes_total", span.bytes, stage=stage, **labels)
+            if span.rows is not None:
+                self.inc(f"{self.prefix}_stage_rows_total", span.rows, stage=stage, **labels)
+            if failed:
+                self.inc(f"{self.prefix}_stage_errors_total", stage=stage, **labels)
+            logger.debug("stage=%s seconds=%.6f bytes=%d rows=%s error=%s %s", stage, seconds, span.bytes,
+                         span.rows, failed, " ".join(f"{k}={v}" for k, v in labels.items()))
+
+    def snapshot(self):
+        """Plain-dict copy of every series, for JSON output."""
+        with self._lock:
+            counters = [{"name": n, "labels": dict(lb), "value": v} for (n, lb), v in self._counters.items()]
+            histograms = [
+                {"name": n, "labels": dict(lb), "count": h.count, "sum": h.sum,
+                 "buckets": dict(zip([*map(str, h.buckets), "+Inf"], h.counts))}
+                for (n, lb), h in self._histograms.items()
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def render(self):
+        """Prometheus text exposition (version 0.0.4) of every series."""
+        def fmt(labels, extra=()):
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            seen = set()
+            for (name, labels), value in counters:
+                if name not in seen:
+                    lines.append(f"# TYPE {name} counter")
+                    seen.add(name)
+                lines.append(f"{name}{fmt(labels)} {value}")
+            for (name, labels), h in histograms:
+                if name not in seen:
+                    lines.append(f"# TYPE {name} histogram")
+                    seen.add(name)
+                cumulative = 0
+                for bound, count in zip([*map(str, h.buckets), "+Inf"], h.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{fmt(labels)} {h.sum}")
+                lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = MetricsRegistry()
+
+
+def instrumented(stage, registry=METRICS):
+    """
+    Decorator timing every call as `stage`; the row count of a returned
+    DataFrame (anything with .shape) is recorded too. Works on coroutines.
+    """
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with registry.timer(stage) as span:
+                    result = await func(*args, **kwargs)
+                    span.rows = _rows(result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with registry.timer(stage) as span:
+                result = func(*args, **kwargs)
+                span.rows = _rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def _rows(result):
+    shape = getattr(result, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+@contextmanager
+def profiled(name, directory="profiles", top=25):
+    """
+    cProfile the enclosed block (this thread only). The stats are dumped to
+    <directory>/<name>-<timestamp>.prof and the top functions by cumulative
+    time are logged. Yields a dict whose "path" is set on exit.
+    """
+    profile = cProfile.Profile()
+    result = {"path": None}
+    profile.enable()
+    try:
+        yield result
+    finally:
+        profile.disable()
+        os.makedirs(directory, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+        path = os.path.join(directory, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+        profile.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(top)
+        logger.info(f"Profile for {name} written to {path}\n{out.getvalue()}")
+        result["path"] = path
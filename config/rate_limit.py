@@ -0,0 +1,38 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host to at most `rate` per second across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter with a sized connection pool that waits on a HostRateLimiter before every send."""
+
+    def __init__(self, limiter, pool_maxsize=10, **kwargs):
+        self.limiter = limiter
+        super().__init__(pool_maxsize=pool_maxsize, **kwargs)
+
+    def send(self, request, **kwargs):
+        self.limiter.wait(request.url)
+        return super().send(request, **kwargs)
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+
+def file_sha256(filepath, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ReportStore:
+    """
+    Index of downloaded exports keyed by symbol and content hash.
+
+    Each symbol's latest export is recorded with its sha256, size and download
+    time in SQLite. The long-form timeseries parsed from an export is cached
+    as Parquet under its content hash, so an unchanged download is never
+    parsed twice. max_age (seconds) is the staleness policy: a report younger
+    than that is served from the store without refetching.
+    """
+
+    def __init__(self, root="reports/store", max_age=24 * 3600):
+        self.root = root
+        self.max_age = max_age
+        self.timeseries_dir = os.path.join(root, "timeseries")
+        os.makedirs(self.timeseries_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "reports.sqlite3"), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            "symbol TEXT PRIMARY KEY, sha256 TEXT NOT NULL, size INTEGER NOT NULL, "
+            "filepath TEXT NOT NULL, downloaded_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def _key(symbol):
+        return symbol.strip().upper()
+
+    def latest(self, symbol):
+        """{"sha256", "size", "filepath", "downloaded_at"} of the last recorded export, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, size, filepath, downloaded_at FROM reports WHERE symbol = ?",
+                (self._key(symbol),),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("sha256", "size", "filepath", "downloaded_at"), row))
+
+    def is_fresh(self, symbol, max_age=None):
+        record = self.latest(symbol)
+        max_age = self.max_age if max_age is None else max_age
+        return record is not None and time.time() - record["downloaded_at"] < max_age
+
+    def record(self, symbol, filepath):
+        """Record a fresh download; returns (sha256, changed) where changed is False for identical bytes."""
+        sha = file_sha256(filepath)
+        previous = self.latest(symbol)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (symbol, sha256, size, filepath, downloaded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self._key(symbol), sha, os.path.getsize(filepath), filepath, time.time()),
+            )
+        return sha, previous is None or previous["sha256"] != sha
+
+    def _timeseries_path(self, sha):
+        return os.path.join(self.timeseries_dir, f"{sha}.parquet")
+
+    def load_timeseries(self, sha, symbol):
+        path = self._timeseries_path(sha)
+        if not os.path.exists(path):
+            return None
+        df = pd.read_parquet(path)
+        # the cache is keyed by content, not by symbol
+        df["symbol"] = symbol
+        return df
+
+    def latest_timeseries(self, symbol):
+        """Cached timeseries of symbol's last recorded export, however old, or None."""
+        record = self.latest(symbol)
+        return self.load_timeseries(record["sha256"], symbol) if record else None
+
+    def save_timeseries(self, sha, df):
+        path = self._timeseries_path(sha)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
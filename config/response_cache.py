@@ -0,0 +1,89 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, namedtuple
+
+from config.metrics import METRICS
+
+CachedResponse = namedtuple("CachedResponse", ["body", "etag", "created"])
+
+
+class ResponseCache:
+    """
+    In-memory TTL + LRU cache of response bodies with single-flight coalescing.
+
+        entry = await cache.get_or_create("ACC", build_body)
+
+    Concurrent calls for a key that is not cached share one build_body() call,
+    run as its own task; if it raises, every waiter gets the exception and
+    nothing is cached. At most `max_entries` bodies are kept, least recently
+    used first out, each for `ttl` seconds. Entries carry a strong ETag (hash
+    of the body).
+    Use from a single event loop.
+    """
+
+    def __init__(self, ttl=300, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+
+    @staticmethod
+    def _key(key):
+        return key.strip().upper()
+
+    def get(self, key):
+        key = self._key(key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, body):
+        key = self._key(key)
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        entry = CachedResponse(body, etag, time.monotonic())
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def remaining_ttl(self, entry):
+        return max(0, int(self.ttl - (time.monotonic() - entry.created)))
+
+    def invalidate(self, key):
+        self._entries.pop(self._key(key), None)
+
+    async def get_or_create(self, key, create):
+        """Cached entry for key, else the body from `await create()` (one call per key at a time)."""
+        entry = self.get(key)
+        if entry is not None:
+            METRICS.inc("screener_response_cache_total", result="hit")
+            return entry
+
+        key = self._key(key)
+        task = self._in_flight.get(key)
+        if task is None:
+            METRICS.inc("screener_response_cache_total", result="miss")
+            # a task of its own, so the build outlives the request that started it
+            task = asyncio.ensure_future(self._create(key, create))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._build_done(key, done))
+        else:
+            METRICS.inc("screener_response_cache_total", result="coalesced")
+        # shield: one waiter being cancelled must not cancel the shared build
+        return await asyncio.shield(task)
+
+    async def _create(self, key, create):
+        return self.put(key, await create())
+
+    def _build_done(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here too, in case every waiter went away
@@ -0,0 +1,177 @@
+import ast
+import re
+
+import numpy as np
+import pandas as pd
+
+from config.utils import TREND_INPUTS, calculate_trends_batch
+
+
+class MetricPanel:
+    """
+    Dense symbol x period x metric float64 array built from the long-form
+    timeseries (Screener.read_excel / TimeseriesStore.read output) of many symbols.
+    Missing observations are NaN.
+    """
+
+    def __init__(self, symbols, periods, metrics, values):
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.periods = pd.DatetimeIndex(periods)
+        self.metrics = list(metrics)
+        self.values = values
+        self._metric_pos = {m: i for i, m in enumerate(self.metrics)}
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, period_code="A"):
+        if period_code is not None and "period_code" in df.columns:
+            df = df[df["period_code"] == period_code]
+        symbols = pd.Categorical(df["symbol"])
+        periods = pd.Categorical(df["period_end"])
+        metrics = pd.Categorical(df["metric_name"])
+
+        values = np.full((len(symbols.categories), len(periods.categories), len(metrics.categories)), np.nan)
+        values[symbols.codes, periods.codes, metrics.codes] = df["metric_value"].to_numpy(dtype="float64")
+        return cls(symbols.categories.astype(str), periods.categories, metrics.categories.astype(str), values)
+
+    @classmethod
+    def from_store(cls, store, metrics=None, symbols=None, period_code="A"):
+        """Load only the needed metrics / symbols from a TimeseriesStore."""
+        df = store.read(metrics=metrics, symbols=symbols, period_codes=[period_code],
+                        columns=["period_end", "metric_name", "metric_value", "symbol"])
+        return cls.from_long(df, period_code=None)
+
+    def metric(self, name):
+        """(symbols x periods) slice for one metric."""
+        return self.values[:, :, self._metric_pos[name]]
+
+    def latest_positions(self):
+        """Per symbol: index into periods of its latest period with any data, -1 when it has none."""
+        has_data = ~np.isnan(self.values).all(axis=2)
+        last_from_end = np.argmax(has_data[:, ::-1], axis=1)
+        return np.where(has_data.any(axis=1), len(self.periods) - 1 - last_from_end, -1)
+
+    def snapshot(self, period=None) -> pd.DataFrame:
+        """symbols x metrics frame at `period`, or at each symbol's latest period when None."""
+        rows = np.arange(len(self.symbols))
+        if period is None:
+            latest = self.latest_positions()
+            snap = self.values[rows, np.maximum(latest, 0), :]
+            snap[latest < 0] = np.nan
+        else:
+            snap = self.values[:, self.periods.get_loc(pd.Timestamp(period)), :]
+        return pd.DataFrame(snap, index=pd.Index(self.symbols, name="symbol"), columns=self.metrics)
+
+    def trends(self):
+        """
+        calculate_trends columns (sales growth, OPM / P/E stats) for every symbol,
+        computed over each symbol's own data periods with calculate_trends_batch.
+        """
+        has_data = ~np.isnan(self.values).all(axis=2)
+        sym_idx, period_idx = np.nonzero(has_data)
+        panel = pd.DataFrame({"symbol": self.symbols[sym_idx]}, index=self.periods[period_idx])
+        for metric, column in TREND_INPUTS.items():
+            if metric in self._metric_pos:
+                panel[column] = self.metric(metric)[sym_idx, period_idx]
+        if "sales_pnl" not in panel.columns:
+            return pd.DataFrame(index=pd.Index(self.symbols, name="symbol"))
+        return calculate_trends_batch(panel).reindex(pd.Index(self.symbols, name="symbol"))
+
+
+class ScreeningEngine:
+    """
+    Evaluate filter expressions across every symbol of a MetricPanel at once.
+
+        engine = ScreeningEngine(MetricPanel.from_long(timeseries))
+        engine.screen("ROE > 15 and price_to_earning < 25 and Sales Growth_5Y > 10",
+                      rank_by="ROE", limit=50)
+
+    Names in an expression are snapshot columns: the panel's metrics plus the
+    calculate_trends columns (Sales Growth_5Y, OPM Avg_3Y, P/E Median_10Y, ...).
+    Supported syntax is comparisons (chained too), and / or / not, + - * / and
+    numeric literals. NaN never passes a comparison.
+    """
+
+    def __init__(self, panel: MetricPanel, period=None):
+        self.panel = panel
+        snapshot = panel.snapshot(period).join(panel.trends())
+        self.snapshot = snapshot
+        self._columns = {name: snapshot[name].to_numpy() for name in snapshot.columns}
+        # longest names first so "Sales Growth_5Y" wins over a metric called "Sales"
+        names = sorted(self._columns, key=len, reverse=True)
+        self._name_re = re.compile("|".join(rf"(?<![\w.]){re.escape(n)}(?![\w.])" for n in names)) if names else None
+
+    def mask(self, expression):
+        placeholders = {}
+
+        def substitute(match):
+            name = match.group(0)
+            key = placeholders.setdefault(name, f"__m{len(placeholders)}")
+            return key
+
+        source = self._name_re.sub(substitute, expression) if self._name_re else expression
+        lookup = {key: self._columns[name] for name, key in placeholders.items()}
+        tree = ast.parse(source, mode="eval")
+        result = _evaluate(tree.body, lookup)
+        return np.broadcast_to(np.asarray(result, dtype=bool), (len(self.panel.symbols),))
+
+    def screen(self, expression, rank_by=None, ascending=False, limit=None, columns=None):
+        """Symbols passing `expression`, ranked by `rank_by`, with the referenced columns."""
+        passed = self.mask(expression)
+        columns = columns or [name for name in self.snapshot.columns if self._mentions(expression, name)]
+        if rank_by and rank_by not in columns:
+            columns = [rank_by] + columns
+        result = self.snapshot.loc[passed, columns]
+        if rank_by:
+            result = result.sort_values(rank_by, ascending=ascending, na_position="last", kind="stable")
+        if limit:
+            result = result.head(limit)
+        return result.reset_index()
+
+    def _mentions(self, expression, name):
+        return re.search(rf"(?<![\w.]){re.escape(name)}(?![\w.])", expression) is not None
+
+
+_COMPARE = {
+    ast.Gt: np.greater, ast.GtE: np.greater_equal, ast.Lt: np.less,
+    ast.LtE: np.less_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal,
+}
+_ARITHMETIC = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide}
+
+
+def _evaluate(node, lookup):
+    if isinstance(node, ast.BoolOp):
+        values = [_evaluate(v, lookup) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        result = values[0]
+        for value in values[1:]:
+            result = combine(result, value)
+        return result
+    if isinstance(node, ast.Compare):
+        left = _evaluate(node.left, lookup)
+        result = True
+        for op, comparator in zip(node.ops, node.comparators):
+            if type(op) not in _COMPARE:
+                raise ValueError(f"Unsupported comparison: {ast.dump(op)}")
+            right = _evaluate(comparator, lookup)
+            with np.errstate(invalid="ignore"):
+                result = np.logical_and(result, _COMPARE[type(op)](left, right))
+            left = right
+        return result
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, lookup)
+        if isinstance(node.op, ast.Not):
+            return np.logical_not(operand)
+        if isinstance(node.op, ast.USub):
+            return np.negative(operand)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _ARITHMETIC[type(node.op)](_evaluate(node.left, lookup), _evaluate(node.right, lookup))
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id not in lookup:
+            raise KeyError(f"Unknown metric in screen expression: {node.id}")
+        return lookup[node.id]
+    raise ValueError(f"Unsupported screen expression: {ast.dump(node)}")
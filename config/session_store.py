@@ -0,0 +1,154 @@
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from config.logger import logger
+
+SESSION_COOKIE = "sessionid"
+
+
+def session_cookie(jar, name=SESSION_COOKIE):
+    """The (unexpired) session cookie in an http.cookiejar.CookieJar, or None."""
+    now = time.time()
+    for cookie in jar:
+        if cookie.name == name and (cookie.expires is None or cookie.expires > now):
+            return cookie
+    return None
+
+
+def drop_session_cookie(jar, name=SESSION_COOKIE):
+    """Remove the session cookie only; csrftoken stays for requests already in flight."""
+    for cookie in [c for c in jar if c.name == name]:
+        jar.clear(cookie.domain, cookie.path, cookie.name)
+
+
+def dump_cookies(jar):
+    return [
+        {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "expires": c.expires,
+         "secure": c.secure}
+        for c in jar
+    ]
+
+
+def load_cookies(jar, cookies):
+    from http.cookiejar import Cookie  # urllib.request and friends; only needed once there is a jar to fill
+
+    for c in cookies:
+        jar.set_cookie(Cookie(
+            version=0, name=c["name"], value=c["value"], port=None, port_specified=False,
+            domain=c["domain"], domain_specified=bool(c["domain"]), domain_initial_dot=c["domain"].startswith("."),
+            path=c["path"], path_specified=True, secure=c["secure"], expires=c["expires"], discard=False,
+            comment=None, comment_url=None, rest={},
+        ))
+
+
+class CookieJarStore:
+    """
+    The cookie jar of an authenticated session as a JSON file, so new
+    processes start logged in. A jar whose session cookie has expired is
+    treated as absent.
+    """
+
+    def __init__(self, path="cache/session.json"):
+        self.path = path
+
+    def load(self, jar):
+        """Fill jar from disk; returns False when there is no live session to restore."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                cookies = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable session file {self.path}: {e}")
+            return False
+
+        now = time.time()
+        live = [c for c in cookies if c["expires"] is None or c["expires"] > now]
+        if not any(c["name"] == SESSION_COOKIE for c in live):
+            logger.info(f"Stored session in {self.path} has expired")
+            return False
+        load_cookies(jar, live)
+        return True
+
+    def save(self, jar):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # the jar holds live credentials
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(dump_cookies(jar), f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class SessionPool:
+    """
+    Fixed set of independently authenticated sessions for fetch workers.
+
+        pool = SessionPool(screener.new_session, size=4)
+        with pool.checkout() as session:
+            ...
+
+    `create(slot)` builds the session for slot 0..size-1; slots are created
+    lazily on first checkout (warm() creates them all up front) and reused.
+    """
+
+    def __init__(self, create, size=4):
+        self.create = create
+        self.size = size
+        self.sessions = []  # every session created so far, idle or checked out
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """Create (log in) every remaining slot, concurrently."""
+        threads = [threading.Thread(target=self._new_slot, name=f"session-warm-{i}")
+                   for i in range(self.size - self._created)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _new_slot(self):
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            slot = self._created
+            self._created += 1
+        try:
+            session = self.create(slot)
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self.sessions.append(session)
+        self._idle.put(session)
+        return True
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            self._new_slot()
+            session = self._idle.get(timeout=timeout)
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def close(self):
+        for session in self.sessions:
+            session.close()
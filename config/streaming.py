@@ -0,0 +1,91 @@
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# long-form columns as served over the wire; strings stay plain (no dictionaries)
+# so every symbol's batches share one schema
+WIRE_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("ns")),
+    ("period_start", pa.timestamp("ns")),
+    ("period_end", pa.timestamp("ns")),
+    ("period_code", pa.string()),
+    ("metric_name", pa.string()),
+    ("metric_value", pa.float64()),
+    ("symbol", pa.string()),
+])
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def filter_timeseries(df: pd.DataFrame, metrics=None, period_codes=None, start=None, end=None, columns=None):
+    """
+    Rows of a long-form timeseries with metric_name in metrics, period_code in
+    period_codes and period_end within [start, end], projected to columns.
+    """
+    mask = pd.Series(True, index=df.index)
+    if metrics:
+        mask &= df["metric_name"].isin(metrics)
+    if period_codes:
+        mask &= df["period_code"].isin(period_codes)
+    if start is not None:
+        mask &= df["period_end"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["period_end"] <= pd.Timestamp(end)
+    df = df[mask.to_numpy()] if not mask.all() else df
+    return df[columns] if columns else df
+
+
+class TimeseriesEncoder:
+    """
+    Incremental encoder for a stream of long-form frames:
+
+        encoder = TimeseriesEncoder("arrow", columns)
+        for df in frames:
+            yield encoder.encode(df)
+        yield encoder.close()
+
+    ndjson emits one JSON object per row; arrow emits an Arrow IPC stream (one
+    record batch per frame); parquet emits a Parquet file (one row group per
+    frame) whose bytes are handed out as they are written. Every call returns
+    the bytes ready so far, possibly b"".
+    """
+
+    def __init__(self, fmt, columns=None):
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Unknown timeseries format: {fmt}")
+        self.format = fmt
+        self.media_type = MEDIA_TYPES[fmt]
+        self.schema = pa.schema([WIRE_SCHEMA.field(c) for c in (columns or WIRE_SCHEMA.names)])
+        self._sink = io.BytesIO()
+        self._writer = None
+        if fmt == "arrow":
+            self._writer = pa.ipc.new_stream(self._sink, self.schema)
+        elif fmt == "parquet":
+            self._writer = pq.ParquetWriter(self._sink, self.schema, compression="zstd")
+
+    def _drain(self):
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def encode(self, df: pd.DataFrame) -> bytes:
+        if df.empty:
+            return b""
+        if self.format == "ndjson":
+            return df.to_json(orient="records", lines=True, date_format="iso").rstrip("\n").encode() + b"\n"
+        table = pa.Table.from_pandas(df[self.schema.names], schema=self.schema, preserve_index=False)
+        self._writer.write_table(table)
+        return self._drain()
+
+    def close(self) -> bytes:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self._drain()
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MISS = object()
+
+
+class SymbolCache:
+    """
+    Persistent symbol -> company URL cache: SQLite on disk with an in-process LRU in front.
+
+    Resolved URLs live for `ttl` seconds; symbols the search endpoint did not
+    know (stored as None) live for `negative_ttl` seconds so bad tickers are
+    retried soon but not on every call. get() returns MISS when the symbol has
+    to be looked up again.
+    """
+
+    def __init__(self, path="cache/symbols.sqlite3", ttl=30 * 24 * 3600, negative_ttl=3600, lru_size=4096):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS symbols ("
+            "symbol TEXT PRIMARY KEY, company_url TEXT, fetched_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def _key(symbol):
+        return symbol.strip().upper()
+
+    def _fresh(self, company_url, fetched_at):
+        ttl = self.ttl if company_url is not None else self.negative_ttl
+        return time.time() - fetched_at < ttl
+
+    def get(self, symbol):
+        key = self._key(symbol)
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if self._fresh(*entry):
+                    self._lru.move_to_end(key)
+                    return entry[0]
+                del self._lru[key]
+
+            row = self._conn.execute(
+                "SELECT company_url, fetched_at FROM symbols WHERE symbol = ?", (key,)
+            ).fetchone()
+            if row is None or not self._fresh(*row):
+                return MISS
+            self._remember(key, row)
+            return row[0]
+
+    def put(self, symbol, company_url):
+        """Store a resolved URL, or None for a symbol the search endpoint does not know."""
+        key = self._key(symbol)
+        entry = (company_url, time.time())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO symbols (symbol, company_url, fetched_at) VALUES (?, ?, ?)",
+                (key, *entry),
+            )
+            self._remember(key, entry)
+
+    def missing(self, symbols):
+        """Symbols (deduplicated, in order) that need a fresh lookup."""
+        seen = set()
+        result = []
+        for symbol in symbols:
+            key = self._key(symbol)
+            if key not in seen and self.get(symbol) is MISS:
+                result.append(symbol)
+            seen.add(key)
+        return result
+
+    def _remember(self, key, entry):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
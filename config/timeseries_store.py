@@ -0,0 +1,178 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.ipc as ipc
+
+# long-form timeseries schema; low-cardinality string columns are dictionary-encoded.
+# revision is 0 for rows of a full write and k for rows merged by the k-th incremental update.
+TIMESERIES_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("ns")),
+    ("period_start", pa.timestamp("ns")),
+    ("period_end", pa.timestamp("ns")),
+    ("period_code", pa.dictionary(pa.int8(), pa.string())),
+    ("metric_name", pa.dictionary(pa.int16(), pa.string())),
+    ("metric_value", pa.float64()),
+    ("symbol", pa.dictionary(pa.int16(), pa.string())),
+    ("revision", pa.int32()),
+])
+
+# one stored value per key; annual and Q4 rows share period_end, hence period_code
+KEY_COLUMNS = ["symbol", "metric_name", "period_code", "period_end"]
+
+DELTA_RE = re.compile(r"\.rev(\d+)\.arrow$")
+
+
+class TimeseriesStore:
+    """
+    Multi-symbol columnar store for the long-form output of Screener.read_excel.
+
+    One uncompressed Arrow IPC file per symbol under root (the partition), so
+    writing a symbol replaces only its own file and reads memory-map the files
+    instead of loading them. read() prunes partitions by symbol and pushes
+    metric / period / date predicates down into the scan, so only matching
+    rows are materialised.
+
+    merge_symbol() persists incremental updates as small delta files next to
+    the symbol's base file; reads resolve each key to its latest revision and
+    a symbol is compacted back into one file after `compact_after` deltas.
+    """
+
+    def __init__(self, root="data/timeseries", compact_after=8):
+        self.root = root
+        self.compact_after = compact_after
+        os.makedirs(root, exist_ok=True)
+        self._fs = pafs.LocalFileSystem(use_mmap=True)
+
+    @staticmethod
+    def _key(symbol):
+        return symbol.strip().upper()
+
+    def _path(self, symbol):
+        return os.path.join(self.root, f"{self._key(symbol)}.arrow")
+
+    def _delta_paths(self, symbol):
+        paths = glob.glob(os.path.join(glob.escape(self.root), f"{glob.escape(self._key(symbol))}.rev*.arrow"))
+        return sorted(paths, key=lambda p: int(DELTA_RE.search(p).group(1)))
+
+    def symbols(self):
+        return sorted(name[:-len(".arrow")] for name in os.listdir(self.root)
+                      if name.endswith(".arrow") and not DELTA_RE.search(name))
+
+    def write(self, timeseries: pd.DataFrame):
+        """Store the full timeseries of every symbol in the frame, replacing what was stored for it."""
+        for symbol, frame in timeseries.groupby("symbol", sort=False):
+            self.write_symbol(symbol, frame)
+
+    def write_symbol(self, symbol, frame: pd.DataFrame):
+        self._write_file(self._path(symbol), symbol, frame, revision=0)
+        for path in self._delta_paths(symbol):
+            os.remove(path)
+
+    def _write_file(self, path, symbol, frame, revision):
+        table = pa.Table.from_pandas(
+            frame[TIMESERIES_SCHEMA.names[:-1]].assign(symbol=self._key(symbol), revision=revision),
+            schema=TIMESERIES_SCHEMA,
+            preserve_index=False,
+        )
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink, ipc.new_file(sink, TIMESERIES_SCHEMA) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def merge_symbol(self, symbol, rows: pd.DataFrame):
+        """
+        Persist only new or revised rows (see diff) for one symbol as a delta
+        file; the first write of a symbol becomes its base file.
+        """
+        if rows.empty:
+            return
+        if not os.path.exists(self._path(symbol)):
+            self.write_symbol(symbol, rows)
+            return
+
+        deltas = self._delta_paths(symbol)
+        revision = int(DELTA_RE.search(deltas[-1]).group(1)) + 1 if deltas else 1
+        path = os.path.join(self.root, f"{self._key(symbol)}.rev{revision:05d}.arrow")
+        self._write_file(path, symbol, rows, revision=revision)
+        if len(deltas) + 1 >= self.compact_after:
+            self.compact(symbol)
+
+    def compact(self, symbol):
+        """Fold a symbol's delta files back into its base file."""
+        self.write_symbol(symbol, self.load_symbol(symbol))
+
+    def load_symbol(self, symbol, metrics=None, period_codes=None):
+        """All current rows of one symbol as a plain pandas frame (empty when not stored)."""
+        df = self.read(metrics=metrics, period_codes=period_codes, symbols=[symbol])
+        for col in ("period_code", "metric_name", "symbol"):
+            df[col] = df[col].astype(object)
+        return df.drop(columns="revision")
+
+    @staticmethod
+    def diff(new: pd.DataFrame, stored: pd.DataFrame) -> pd.DataFrame:
+        """Rows of `new` whose key is not in `stored` or whose metric_value changed."""
+        if stored is None or stored.empty:
+            return new.reset_index(drop=True)
+        keys = [k for k in KEY_COLUMNS if k != "symbol"]
+        old = stored[keys + ["metric_value"]].rename(columns={"metric_value": "_stored_value"})
+        merged = new.merge(old, on=keys, how="left")
+        changed = merged["_stored_value"].isna() | ~np.isclose(
+            merged["metric_value"], merged["_stored_value"], rtol=1e-12, atol=1e-9)
+        return merged.loc[changed.to_numpy(), list(new.columns)].reset_index(drop=True)
+
+    def dataset(self, symbols=None):
+        return ds.dataset(self._paths(symbols), schema=TIMESERIES_SCHEMA, format="ipc", filesystem=self._fs)
+
+    def _paths(self, symbols):
+        if symbols is None:
+            symbols = self.symbols()
+        paths = []
+        for symbol in symbols:
+            if os.path.exists(self._path(symbol)):
+                paths.append(self._path(symbol))
+                paths.extend(self._delta_paths(symbol))
+        return paths
+
+    def read_table(self, metrics=None, period_codes=None, symbols=None, start=None, end=None, columns=None):
+        """
+        Scan the store with predicates pushed into the dataset scanner:
+        metric_name in metrics, period_code in period_codes, symbol partitions in
+        symbols and period_end within [start, end]. Returns a pyarrow Table.
+        """
+        predicates = []
+        if metrics is not None:
+            predicates.append(pc.field("metric_name").isin(list(metrics)))
+        if period_codes is not None:
+            predicates.append(pc.field("period_code").isin(list(period_codes)))
+        if start is not None:
+            predicates.append(pc.field("period_end") >= pa.scalar(pd.Timestamp(start), pa.timestamp("ns")))
+        if end is not None:
+            predicates.append(pc.field("period_end") <= pa.scalar(pd.Timestamp(end), pa.timestamp("ns")))
+
+        expression = None
+        for predicate in predicates:
+            expression = predicate if expression is None else expression & predicate
+
+        paths = self._paths(symbols)
+        dataset = ds.dataset(paths, schema=TIMESERIES_SCHEMA, format="ipc", filesystem=self._fs)
+        if not any(DELTA_RE.search(p) for p in paths):
+            return dataset.to_table(columns=columns, filter=expression)
+
+        # deltas present: keep the latest revision of every key
+        needed = list(dict.fromkeys((columns or TIMESERIES_SCHEMA.names) + KEY_COLUMNS + ["revision"]))
+        df = dataset.to_table(columns=needed, filter=expression).to_pandas()
+        df = df.sort_values("revision", kind="stable").drop_duplicates(KEY_COLUMNS, keep="last")
+        df = df.sort_values(["symbol", "timestamp"] if "timestamp" in df.columns else ["symbol"], kind="stable")
+        schema = pa.schema([TIMESERIES_SCHEMA.field(c) for c in (columns or TIMESERIES_SCHEMA.names)])
+        return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+    def read(self, metrics=None, period_codes=None, symbols=None, start=None, end=None, columns=None):
+        """Same as read_table, as a pandas DataFrame (dictionary columns become categoricals)."""
+        return self.read_table(metrics, period_codes, symbols, start, end, columns).to_pandas()
@@ -1,7 +1,19 @@
+import warnings
+
 import pandas as pd
 from config.logger import logger
+from config.metrics import METRICS
 import numpy as np
 
+TREND_YEARS = [10, 7, 5, 3]
+# (column, output label, statistic over the last n years)
+TREND_STATS = [
+    ('yearly OPM', 'OPM Avg', 'mean'),
+    ('price_to_earning', 'P/E Median', 'median'),
+]
+# long-form metric name -> calculate_trends input column
+TREND_INPUTS = {"sales": "sales_pnl", "yearly OPM": "yearly OPM", "price_to_earning": "price_to_earning"}
+
 def detect_year_end(df: pd.DataFrame) -> str:
     annual_month = df.loc[df['period_code'] == 'A', 'timestamp'].dt.month.unique()
     if 12 in annual_month:
@@ -11,52 +23,104 @@ def detect_year_end(df: pd.DataFrame) -> str:
 
 
 
-def make_unique_columns(df: pd.DataFrame) -> pd.DataFrame:
+def make_unique_labels(labels) -> list:
     new_cols = []
     seen = {}
-    for i, col in enumerate(df.columns):
+    for i, col in enumerate(labels):
         if col in seen:
             seen[col] += 1
             new_cols.append(f"{col}.{seen[col]}")
         else:
             seen[col] = 0
             new_cols.append(col)
-    df.columns = new_cols
+    return new_cols
+
+
+def make_unique_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = make_unique_labels(df.columns)
     return df
 
 
+# section name -> (start marker, end marker, display name) in column 0 of the "Data Sheet"
+SECTION_MARKERS = {
+    "pnl": ("PROFIT & LOSS", "Quarters", "PNL"),
+    "balance": ("BALANCE SHEET", "CASH FLOW:", "Balance Sheet"),
+    "quarters": ("Quarters", "BALANCE SHEET", "Quarters"),
+    "cashflow": ("CASH FLOW:", " Adjusted Equity Shares in Cr", "Cash Flow"),
+}
+
+
+def index_sections(dfs, markers) -> dict:
+    """
+    Single pass over column 0 of the raw sheet, returning the first row
+    position of every requested marker label that is present.
+    """
+    wanted = {m for m in markers if m is not None}
+    positions = {}
+    for pos, label in enumerate(dfs[0].tolist()):
+        if label in wanted and label not in positions:
+            positions[label] = pos
+            if len(positions) == len(wanted):
+                break
+    return positions
+
+
+def parse_sections(dfs, sections=None) -> dict:
+    """
+    Parse all sections of the raw "Data Sheet" grid from one marker scan.
+    Returns {section: float64 DataFrame indexed by report date, or None on failure}.
+    """
+    sections = sections or SECTION_MARKERS
+    markers = [m for start, end, _ in sections.values() for m in (start, end)]
+    positions = index_sections(dfs, markers)
+
+    parsed = {}
+    for name, (start_block, end_block, section_name) in sections.items():
+        parsed[name] = _parse_indexed_section(dfs, positions, start_block, end_block, section_name)
+    return parsed
+
+
 def parse_section(dfs, start_block, end_block=None, section_name=""):
-    try:
-        start = dfs.index[dfs[0] == start_block][0]
-        header_row = start + 1
-        if end_block:
-            try:
-                end = dfs.index[dfs[0] == end_block][0]
-            except IndexError:
-                end = len(dfs)
-        else:
-            end = len(dfs)
+    positions = index_sections(dfs, [start_block, end_block])
+    return _parse_indexed_section(dfs, positions, start_block, end_block, section_name)
 
-        block = dfs.iloc[header_row: end].reset_index(drop=True)
-        block.columns = block.iloc[0]
-        df = block.drop(0).reset_index(drop=True)
-        df = df.dropna(how="all")
-        df = make_unique_columns(df)
 
-        if "Report Date" in df.columns:
-            df = df.set_index("Report Date")
+def _parse_indexed_section(dfs, positions, start_block, end_block, section_name):
+    with METRICS.timer("parse_section", section=section_name) as span:
+        parsed = _parse_indexed_section_rows(dfs, positions, start_block, end_block, section_name)
+        if parsed is None:
+            METRICS.inc("screener_stage_errors_total", stage="parse_section", section=section_name)
         else:
+            span.rows = len(parsed)
+        return parsed
+
+
+def _parse_indexed_section_rows(dfs, positions, start_block, end_block, section_name):
+    try:
+        if start_block not in positions:
+            raise IndexError(f"{start_block} marker not found")
+        header_row = positions[start_block] + 1
+        end = positions.get(end_block, len(dfs)) if end_block else len(dfs)
+
+        grid = dfs.iloc[header_row: end].to_numpy(dtype=object)
+        header = make_unique_labels(grid[0])
+        rows = pd.DataFrame(grid[1:]).dropna(how="all").to_numpy(dtype=object)
+
+        if "Report Date" not in header:
             raise KeyError(f"Report Date column not found in {section_name} section!")
+        label_pos = header.index("Report Date")
+        # sections narrower than the sheet (e.g. fewer quarters than years) leave blank date columns
+        value_pos = [i for i in range(len(header)) if i != label_pos and not pd.isna(grid[0][i])]
 
-        df = df.T
-        if "Total" in df.columns:
-            df = df.drop("Total", axis=1)
-        df = make_unique_columns(df)
-        df = clean_df(df)
-        df.index = pd.to_datetime(df.index, format="%Y-%m-%d", errors="coerce")
-        df = df.apply(pd.to_numeric)
+        # transpose: one row per report date, one column per line item
+        labels = rows[:, label_pos]
+        values = rows[:, value_pos].T.astype("float64")
+        keep = labels != "Total"
+        values = values[:, keep]
+        values[np.isnan(values)] = 0.0
 
-        return df
+        dates = pd.to_datetime(pd.Index([header[i] for i in value_pos]), format="%Y-%m-%d", errors="coerce")
+        return pd.DataFrame(values, index=dates, columns=make_unique_labels(labels[keep]))
 
     except Exception as e:
         logger.error(f"Unable to parse section: {e}")
@@ -73,10 +137,11 @@ def calculate_trends(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate Sales growth (10/7/5/3-year + recent) and basic OPM / P/E stats.
     Assumes df is indexed by date (or at least sorted chronologically) and
-    contains columns: 'sales_pnl', 'yearly OPM', 'price to earning' (or adjust names).
+    contains columns: 'sales_pnl', 'yearly OPM', 'price_to_earning' (OPM / P/E are optional).
+    OPM stats are the mean and P/E stats the median over the last n years.
     """
 
-    # Ensure chronological order
+    # Ensure chronological order (sort_index copies, so the caller's frame is untouched)
     df = df.sort_index()
 
     # Ensure the key columns are numeric
@@ -86,7 +151,7 @@ def calculate_trends(df: pd.DataFrame) -> pd.DataFrame:
     df['sales_pnl'] = pd.to_numeric(df['sales_pnl'], errors='coerce')
 
     trends = {}
-    years_list = [10, 7, 5, 3]
+    years_list = TREND_YEARS
 
     if len(df) == 0:
         return pd.DataFrame([trends])
@@ -127,4 +192,66 @@ def calculate_trends(df: pd.DataFrame) -> pd.DataFrame:
     else:
         trends['Sales Growth_RECENT'] = np.nan
 
+    # OPM / P/E stats over the last n years
+    for col, label, stat in TREND_STATS:
+        if col not in df.columns:
+            continue
+        series = pd.to_numeric(df[col], errors='coerce')
+        for n in years_list:
+            trends[f"{label}_{n}Y"] = round(getattr(series.iloc[-n:], stat)(), 2)
+
     return pd.DataFrame([trends])
+
+
+def calculate_trends_batch(panel: pd.DataFrame, symbol_col: str = "symbol") -> pd.DataFrame:
+    """
+    calculate_trends for many symbols in one vectorized pass.
+    panel holds the annual rows of every symbol: a `symbol_col` column plus
+    'sales_pnl' and optionally 'yearly OPM' / 'price_to_earning', indexed by date.
+    Returns one row per symbol (index = symbol) with the same columns as calculate_trends.
+    """
+    if 'sales_pnl' not in panel.columns:
+        raise KeyError("sales_pnl column missing from panel")
+
+    # chronological order within each symbol
+    ordered = panel.assign(_date=panel.index).sort_values([symbol_col, "_date"], kind="stable")
+    symbols, group = np.unique(ordered[symbol_col].to_numpy(), return_inverse=True)
+    counts = np.bincount(group, minlength=len(symbols))
+    width = int(counts.max()) if len(counts) else 0
+    # right-align every symbol's history: column width - 1 is its latest year
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    cols = width - counts[group] + (np.arange(len(ordered)) - starts[group])
+
+    def aligned(col):
+        grid = np.full((len(symbols), width), np.nan)
+        grid[group, cols] = pd.to_numeric(ordered[col], errors='coerce').to_numpy(dtype="float64")
+        return grid
+
+    sales = aligned('sales_pnl')
+    rows = np.arange(len(symbols))
+    latest = sales[:, -1] if width else np.full(len(symbols), np.nan)
+
+    def cagr(intervals):
+        start = sales[rows, np.clip(width - 1 - intervals, 0, max(width - 1, 0))] if width else latest
+        valid = (intervals > 0) & (start > 0) & ~np.isnan(latest)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = (latest / start) ** (1.0 / np.maximum(intervals, 1)) - 1.0
+        return np.where(valid, np.round(growth * 100, 2), np.nan)
+
+    trends = {}
+    for n in TREND_YEARS:
+        trends[f"Sales Growth_{n}Y"] = cagr(np.minimum(n, counts - 1))
+    trends['Sales Growth_RECENT'] = np.where(counts >= 3, cagr(np.full(len(symbols), 2)), np.nan)
+
+    for col, label, stat in TREND_STATS:
+        if col not in ordered.columns:
+            continue
+        grid = aligned(col)
+        reducer = np.nanmean if stat == "mean" else np.nanmedian
+        for n in TREND_YEARS:
+            with warnings.catch_warnings():
+                # all-NaN windows are expected for short histories and give NaN
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                trends[f"{label}_{n}Y"] = np.round(reducer(grid[:, -n:], axis=1), 2)
+
+    return pd.DataFrame(trends, index=pd.Index(symbols, name=symbol_col))
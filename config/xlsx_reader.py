@@ -0,0 +1,176 @@
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timedelta
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+import pandas as pd
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# built-in number formats that Excel renders as dates / times
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(45, 48))
+
+CELL_REF_RE = re.compile(r"([A-Z]+)(\d+)")
+# strip quoted literals, [colour]/[locale] blocks and escaped chars before looking for date tokens
+FORMAT_LITERAL_RE = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+
+
+def read_data_sheet(filepath, sheet_name="Data Sheet") -> pd.DataFrame:
+    """
+    Stream one worksheet out of an .xlsx file into a raw grid, equivalent to
+    pd.read_excel(filepath, sheet_name=sheet_name, header=None) for the cell
+    types found in Screener exports (numbers, dates, shared / inline strings
+    and errors). Only the sheet XML, shared strings and styles parts
+    are read; openpyxl's workbook object model is never built.
+    """
+    with zipfile.ZipFile(filepath) as zf:
+        sheet_path, date1904 = _locate_sheet(zf, sheet_name)
+        shared_strings = _read_shared_strings(zf)
+        date_styles = _read_date_styles(zf)
+        with zf.open(sheet_path) as fh:
+            cells = _read_cells(fh, shared_strings, date_styles, date1904)
+
+    if not cells:
+        return pd.DataFrame()
+
+    rows, cols, values = zip(*cells)
+    rows = np.asarray(rows) - 1
+    cols = np.asarray(cols) - 1
+    # like pandas, leading empty rows and columns are kept and the grid ends at the last non-empty cell
+    grid = np.full((rows.max() + 1, cols.max() + 1), np.nan, dtype=object)
+    grid[rows, cols] = values
+    return pd.DataFrame(grid).infer_objects()
+
+
+def _locate_sheet(zf, sheet_name):
+    rel_id = None
+    date1904 = False
+    with zf.open("xl/workbook.xml") as fh:
+        for _, elem in iterparse(fh):
+            if elem.tag == f"{MAIN_NS}workbookPr":
+                date1904 = elem.get("date1904") in ("1", "true")
+            elif elem.tag == f"{MAIN_NS}sheet" and elem.get("name") == sheet_name:
+                rel_id = elem.get(f"{REL_NS}id")
+                break
+    if rel_id is None:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    with zf.open("xl/_rels/workbook.xml.rels") as fh:
+        for _, elem in iterparse(fh):
+            if elem.tag == f"{PKG_REL_NS}Relationship" and elem.get("Id") == rel_id:
+                target = elem.get("Target")
+                if target.startswith("/"):
+                    return target.lstrip("/"), date1904
+                return posixpath.normpath(posixpath.join("xl", target)), date1904
+    raise ValueError(f"Worksheet part for '{sheet_name}' not found")
+
+
+def _read_shared_strings(zf):
+    strings = []
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return strings
+    with zf.open("xl/sharedStrings.xml") as fh:
+        for _, elem in iterparse(fh):
+            if elem.tag == f"{MAIN_NS}si":
+                # rich text strings are split over several <r><t> runs
+                strings.append("".join(t.text or "" for t in elem.iter(f"{MAIN_NS}t")))
+                elem.clear()
+    return strings
+
+
+def _read_date_styles(zf):
+    """Indexes into cellXfs whose number format is a date format."""
+    if "xl/styles.xml" not in zf.namelist():
+        return set()
+    custom_formats = {}
+    xf_formats = []
+    in_cell_xfs = False
+    with zf.open("xl/styles.xml") as fh:
+        for event, elem in iterparse(fh, events=("start", "end")):
+            if elem.tag == f"{MAIN_NS}cellXfs":
+                in_cell_xfs = event == "start"
+            elif event == "end" and elem.tag == f"{MAIN_NS}numFmt":
+                custom_formats[int(elem.get("numFmtId"))] = elem.get("formatCode", "")
+            elif event == "end" and in_cell_xfs and elem.tag == f"{MAIN_NS}xf":
+                xf_formats.append(int(elem.get("numFmtId", 0)))
+
+    date_styles = set()
+    for idx, fmt_id in enumerate(xf_formats):
+        if fmt_id in BUILTIN_DATE_FORMATS:
+            date_styles.add(idx)
+        elif fmt_id in custom_formats and _is_date_format(custom_formats[fmt_id]):
+            date_styles.add(idx)
+    return date_styles
+
+
+def _is_date_format(format_code):
+    code = FORMAT_LITERAL_RE.sub("", format_code.split(";")[0]).lower()
+    return any(token in code for token in ("d", "m", "y", "h", "s"))
+
+
+def _from_excel(value, date1904):
+    if date1904:
+        return datetime(1904, 1, 1) + timedelta(days=value)
+    # Excel's 1900 calendar counts a non-existent 1900-02-29
+    if value < 60:
+        value += 1
+    return datetime(1899, 12, 30) + timedelta(days=value)
+
+
+def _convert_number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def _read_cells(fh, shared_strings, date_styles, date1904):
+    cells = []
+    row_num = 0
+    col_num = 0
+    for event, elem in iterparse(fh, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == f"{MAIN_NS}row":
+                row_num = int(elem.get("r", row_num + 1))
+                col_num = 0
+        elif tag == f"{MAIN_NS}c":
+            ref = elem.get("r")
+            if ref:
+                letters, digits = CELL_REF_RE.match(ref).groups()
+                col_num = 0
+                for ch in letters:
+                    col_num = col_num * 26 + ord(ch) - 64
+                row_num = int(digits)
+            else:
+                col_num += 1
+
+            cell_type = elem.get("t", "n")
+            if cell_type == "inlineStr":
+                value = "".join(t.text or "" for t in elem.iter(f"{MAIN_NS}t"))
+            else:
+                v = elem.find(f"{MAIN_NS}v")
+                text = v.text if v is not None else None
+                if text is None:
+                    value = None
+                elif cell_type == "s":
+                    value = shared_strings[int(text)]
+                elif cell_type == "str":
+                    value = text
+                elif cell_type == "b":
+                    value = text == "1"
+                elif cell_type == "e":
+                    value = np.nan
+                elif int(elem.get("s", 0)) in date_styles:
+                    value = _from_excel(float(text), date1904)
+                else:
+                    value = _convert_number(text)
+
+            if value is not None and value != "":
+                cells.append((row_num, col_num, value))
+            elem.clear()
+        elif tag == f"{MAIN_NS}row":
+            elem.clear()
+    return cells
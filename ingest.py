@@ -0,0 +1,300 @@
+"""
+Batch ingestion of Screener exports into one output.
+
+    python ingest.py reports/                        # every reports/export_*.xlsx -> data/timeseries
+    python ingest.py reports/ --symbols ACC TCS      # only these symbols' exports
+    python ingest.py reports/ --symbols-file nifty.txt --fetch
+    python ingest.py reports/ --csv timeseries.csv   # append to a single CSV instead
+
+Each export goes through Screener.read_excel in a process pool sized to the
+cores. With the default store output the workers write their own symbol into
+the TimeseriesStore, so no timeseries data travels back to the parent; with
+--csv the parent appends each result as it arrives.
+
+Progress is recorded per file in a JSONL manifest next to the output; files
+already ingested with the same size and mtime are skipped on the next run
+(--force re-ingests them). A failing file is logged in the manifest and does
+not stop the batch; if one kills its worker process, the files that were in
+flight with it are rerun one at a time and only the culprit is failed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from config.logger import logger
+
+_worker = {}
+
+
+@dataclass
+class IngestResult:
+    file: str
+    symbol: str
+    size: int
+    mtime_ns: int
+    status: str
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def symbol_from_path(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name[len("export_"):] if name.startswith("export_") else name
+
+
+def _init_worker(store_root):
+    from config.timeseries_store import TimeseriesStore
+    from screener import Screener
+
+    _worker["screener"] = Screener(symbol_cache=False, report_store=False)
+    _worker["store"] = TimeseriesStore(store_root) if store_root else None
+
+
+def _ingest_file(path, symbol, size, mtime_ns):
+    """Runs in a worker: read_excel one export and write it out. Returns (IngestResult, csv text or None)."""
+    start = time.perf_counter()
+    try:
+        df = _worker["screener"].read_excel(path, symbol)
+        if df.empty:
+            raise ValueError("no rows parsed")
+        csv = None
+        if _worker["store"] is not None:
+            _worker["store"].write_symbol(symbol, df)
+        else:
+            csv = df.to_csv(index=False, header=False)
+        result = IngestResult(path, symbol, size, mtime_ns, "ok", len(df), time.perf_counter() - start)
+        return result, csv
+    except Exception as e:
+        return IngestResult(path, symbol, size, mtime_ns, "error", 0, time.perf_counter() - start, str(e)), None
+
+
+def _pool(workers, store_root):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store_root,))
+
+
+def _isolate(items, store_root):
+    """
+    Run each (path, symbol, size, mtime_ns) alone in a single-worker pool and
+    yield (item, IngestResult, csv text or None); only a file whose own worker
+    dies is reported as an error for it.
+    """
+    executor = None
+    try:
+        for item in items:
+            if executor is None:
+                executor = _pool(1, store_root)
+            try:
+                result, csv = executor.submit(_ingest_file, *item).result()
+            except BrokenProcessPool as e:
+                result, csv = IngestResult(*item, "error", error=f"worker process died: {e}"), None
+                executor.shutdown(wait=True)
+                executor = None
+            yield item, result, csv
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class Manifest:
+    """Append-only JSONL log of ingested files; the last entry per file wins."""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of an interrupted run
+                    self.done[entry["file"]] = entry
+        self._file = None
+
+    def is_done(self, path, size, mtime_ns):
+        entry = self.done.get(os.path.abspath(path))
+        return bool(entry) and entry["status"] == "ok" and entry["size"] == size and entry["mtime_ns"] == mtime_ns
+
+    def record(self, result: IngestResult):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        entry = {**asdict(result), "file": os.path.abspath(result.file)}
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        self.done[entry["file"]] = entry
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def resolve_files(directory, symbols=None, fetch=False):
+    """[(path, symbol)] for every export in directory, or for the given symbols."""
+    if symbols is None:
+        names = sorted(n for n in os.listdir(directory) if n.startswith("export_") and n.endswith(".xlsx"))
+        return [(os.path.join(directory, n), symbol_from_path(n)) for n in names]
+
+    files = {s: os.path.join(directory, f"export_{s}.xlsx") for s in symbols}
+    missing = [s for s, path in files.items() if not os.path.exists(path)]
+    if missing and fetch:
+        from screener import Screener
+
+        screener = Screener(reports_dir=directory)
+        for fetched in screener.fetch_many(missing):
+            if fetched.ok:
+                files[fetched.symbol] = fetched.filepath
+    return [(path, symbol) for symbol, path in files.items()]
+
+
+def ingest(files, store_root="data/timeseries", csv_path=None, manifest_path=None, workers=None, force=False):
+    """
+    Ingest [(path, symbol)] with a process pool and return a summary dict
+    (files ok / failed / skipped, rows, elapsed seconds, files/s, rows/s).
+    """
+    workers = workers or os.cpu_count() or 1
+    if manifest_path is None:
+        manifest_path = f"{csv_path}.manifest.jsonl" if csv_path else os.path.join(store_root, "ingest_manifest.jsonl")
+    manifest = Manifest(manifest_path)
+
+    pending, skipped, failed = [], 0, 0
+    for path, symbol in files:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            manifest.record(IngestResult(path, symbol, -1, -1, "error", error=str(e)))
+            failed += 1
+            continue
+        if not force and manifest.is_done(path, stat.st_size, stat.st_mtime_ns):
+            skipped += 1
+            continue
+        pending.append((path, symbol, stat.st_size, stat.st_mtime_ns))
+
+    ok, rows = 0, 0
+
+    def record(item, result, csv):
+        nonlocal ok, rows, failed
+        if csv is not None:
+            out.write(csv)
+            out.flush()
+        manifest.record(result)
+        if result.status == "ok":
+            ok += 1
+            rows += result.rows
+        else:
+            failed += 1
+            logger.error(f"Failed to ingest {item[0]}: {result.error}")
+
+    start = time.perf_counter()
+    out = open(csv_path, "a", encoding="utf-8", newline="") if csv_path else None
+    try:
+        if out is not None and out.tell() == 0:
+            from screener import LONG_COLUMNS
+            out.write(",".join(LONG_COLUMNS) + "\n")
+
+        worker_root = None if csv_path else store_root
+        queue = iter(pending)
+        in_flight = {}
+        suspects = []
+        executor = _pool(workers, worker_root)
+
+        def submit():
+            # bounded window so finished CSV chunks never pile up in the parent
+            while len(in_flight) < workers * 2:
+                item = next(queue, None)
+                if item is None:
+                    return
+                try:
+                    in_flight[executor.submit(_ingest_file, *item)] = item
+                except BrokenProcessPool:
+                    suspects.append(item)
+                    return
+
+        def collect(futures):
+            for future in futures:
+                item = in_flight.pop(future)
+                try:
+                    record(item, *future.result())
+                except BrokenProcessPool:
+                    suspects.append(item)
+                except Exception as e:
+                    record(item, IngestResult(*item, "error", error=repr(e)), None)
+
+        try:
+            submit()
+            while in_flight or suspects:
+                if in_flight:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED)[0])
+                if suspects:
+                    # a worker died and took the pool with it: every task still in flight fails
+                    # the same way, so let those settle, then rerun the lot one at a time to
+                    # find the file that killed it
+                    collect(wait(in_flight)[0])
+                    executor.shutdown(wait=True)
+                    logger.warning(f"Worker process died; retrying {len(suspects)} files one at a time")
+                    for item, result, csv in _isolate(suspects, worker_root):
+                        record(item, result, csv)
+                    suspects.clear()
+                    executor = _pool(workers, worker_root)
+                submit()
+        finally:
+            executor.shutdown(wait=True)
+    finally:
+        manifest.close()
+        if out is not None:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "files_ok": ok,
+        "files_failed": failed,
+        "files_skipped": skipped,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "files_per_sec": round(ok / elapsed, 2) if elapsed else 0.0,
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+    }
+    logger.info(f"Ingested {ok} files ({rows} rows) in {elapsed:.2f}s: "
+                f"{summary['files_per_sec']} files/s, {summary['rows_per_sec']} rows/s; "
+                f"{failed} failed, {skipped} skipped")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", default="reports")
+    parser.add_argument("--symbols", nargs="+", help="ingest only export_<SYMBOL>.xlsx for these symbols")
+    parser.add_argument("--symbols-file", help="file with one symbol per line")
+    parser.add_argument("--fetch", action="store_true", help="download exports missing for --symbols first")
+    parser.add_argument("--store", default="data/timeseries", help="TimeseriesStore root (default output)")
+    parser.add_argument("--csv", help="append to this CSV file instead of the store")
+    parser.add_argument("--manifest", help="progress manifest (default: next to the output)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: cpu count)")
+    parser.add_argument("--force", action="store_true", help="re-ingest files already in the manifest")
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if args.symbols_file:
+        with open(args.symbols_file, encoding="utf-8") as f:
+            symbols = (symbols or []) + [line.strip() for line in f if line.strip()]
+
+    files = resolve_files(args.directory, symbols, fetch=args.fetch)
+    if not files:
+        sys.exit(f"No export_*.xlsx files in {args.directory}")
+
+    summary = ingest(files, store_root=args.store, csv_path=args.csv, manifest_path=args.manifest,
+                     workers=args.workers, force=args.force)
+    print(json.dumps(summary))
+    if summary["files_failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,19 @@
-from pydantic import BaseModel
+from typing import List
+
+from pydantic import BaseModel, Field, field_validator
 
 
 class Symbol(BaseModel):
     symbol: str
+
+
+class Symbols(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=2000)
+
+    @field_validator("symbols")
+    @classmethod
+    def non_blank(cls, symbols):
+        symbols = [s.strip() for s in symbols if s.strip()]
+        if not symbols:
+            raise ValueError("at least one non-blank symbol is required")
+        return symbols
@@ -1,53 +1,462 @@
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit
 
 import numpy as np
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from dateutil.relativedelta import relativedelta
 
+from config.derived_metrics import DERIVED_METRICS, MetricEvaluator
+from config.html_extract import CSRF_INPUT, EXPORT_BUTTON, find_tag
 from config.logger import logger
+from config.metrics import METRICS, instrumented
+from config.report_store import ReportStore
+from config.session_store import CookieJarStore, SessionPool, drop_session_cookie, session_cookie
+from config.symbol_cache import MISS, SymbolCache
 from dotenv import load_dotenv
 import os
-from config.utils import parse_section, calculate_trends, detect_year_end
+from config.utils import TREND_INPUTS, parse_sections, calculate_trends
+from config.xlsx_reader import read_data_sheet
 
-load_dotenv()
+SESSION_PATH = "cache/session.json"
 
+LONG_COLUMNS = ["timestamp", "period_start", "period_end", "period_code", "metric_name", "metric_value", "symbol"]
 
-class Screener:
-    def __init__(self):
-        self.login_url = "https://www.screener.in/login/"
+METRIC_SUFFIX_RE = re.compile(r"(?P<base>.+)_(?P<suffix>pnl|quarters|balance|cashflow)$")
+
+# month of period_end -> fiscal quarter code (Indian FY, April - March)
+QUARTER_CODES = {6: "Q1", 9: "Q2", 12: "Q3", 3: "Q4"}
+
+
+def split_metric(col: str):
+    """Split a wide column name into (base name, section suffix or None)."""
+    m = METRIC_SUFFIX_RE.match(col)
+    if m:
+        return m.group("base").strip(), m.group("suffix")
+    # no suffix -> assume annual (A)
+    return col.strip(), None
+
+
+def _counted(chunks, span):
+    """Pass chunks through, adding their size to a METRICS span."""
+    for chunk in chunks:
+        span.bytes += len(chunk)
+        yield chunk
+
+
+@dataclass
+class IncrementalUpdate:
+    symbol: str
+    rows: pd.DataFrame
+    annual_periods: list
+    quarterly_periods: list
+    trends: Optional[pd.DataFrame]
+
+
+@dataclass
+class FetchResult:
+    symbol: str
+    filepath: Optional[str]
+    error: Optional[str]
+    seconds: float
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class ScreenerBase:
+    """
+    Settings (URLs, headers, credentials, caches) and the export parsing
+    shared by Screener and async_screener.AsyncScreener. It does no network
+    I/O itself; the subclasses add the HTTP client and the fetch methods.
+    """
+    def __init__(self, base_url="https://www.screener.in", reports_dir="reports", symbol_cache=None,
+                 report_store=None, session_path=None):
+        """
+        symbol_cache: SymbolCache for symbol -> company URL lookups; None uses
+        the default on-disk cache, False disables caching.
+        report_store: ReportStore used by get_timeseries; None uses one under
+        reports_dir/store, False disables it.
+        session_path: JSON file the authenticated cookie jar is kept in, so a
+        new process starts logged in; None uses cache/session.json, False
+        keeps sessions in memory only.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.reports_dir = reports_dir
+        self.symbol_cache = SymbolCache() if symbol_cache is None else symbol_cache
+        self.report_store = ReportStore(os.path.join(reports_dir, "store")) if report_store is None else report_store
+        self.session_path = SESSION_PATH if session_path is None else session_path
+        self.login_url = f"{self.base_url}/login/"
         self.headers = {
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
             "Accept-Language": "en-IN,en-GB;q=0.9,en-US;q=0.8,en;q=0.7",
             "Cache-Control": "max-age=0",
             "Content-Type": "application/x-www-form-urlencoded",
-            "Origin": "https://www.screener.in",
-            "Referer": "https://www.screener.in/",
+            "Origin": self.base_url,
+            "Referer": f"{self.base_url}/",
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36",
         }
-        self.symbol_url = "https://www.screener.in/api/company/search/"
+        self.symbol_url = f"{self.base_url}/api/company/search/"
+        # symbol -> why its last fetch_data failed, for callers that only see the None
+        self.fetch_errors = {}
 
+        load_dotenv()
         self.email = os.getenv("SCREENER_EMAIL")
         self.password = os.getenv("SCREENER_PASSWORD")
         self.csrfmiddlewaretoken = ""
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
 
-    def is_logged_in(self):
-        return "sessionid" in self.session.cookies
+    def login_required(self, resp):
+        """True when the server rejected the session: 403, or a redirect to the login page."""
+        if resp.status_code == 403:
+            return True
+        login_path = urlsplit(self.login_url).path
+        return (urlsplit(str(resp.url)).path.startswith(login_path)
+                or urlsplit(resp.headers.get("Location", "")).path.startswith(login_path))
+
+    def melt_combined(self, combined_df: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        """Alias of melt_combined_vectorized."""
+        return self.melt_combined_vectorized(combined_df, symbol)
+
+    @instrumented("melt_combined")
+    def melt_combined_vectorized(self, combined_df: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        """
+        Take the wide combined DataFrame (index = dates, columns like
+        'adjusted equity shares in cr_cashflow', 'borrowings_balance', 'sales_quarters', ...)
+        and melt it into the final long timeseries format:
+        timestamp, period_start, period_end, period_code, metric_name, metric_value, symbol
+
+        Metric names are split once per column, and period_start is computed
+        with month arithmetic on datetime64 arrays.
+        """
+        if combined_df is None or combined_df.empty:
+            return pd.DataFrame(columns=LONG_COLUMNS)
+
+        df = self._datetime_indexed(combined_df)
+        n_rows, n_cols = df.shape
+
+        # (columns x rows) value matrix, flattened below in the same order as DataFrame.melt
+        values = np.full((n_cols, n_rows), np.nan, dtype="float64")
+        for j in range(n_cols):
+            col = df.iloc[:, j]
+            if pd.api.types.is_datetime64_any_dtype(col):
+                continue
+            values[j] = pd.to_numeric(col, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+        # per column: base metric name and whether it is a quarterly series
+        parts = [split_metric(c) for c in df.columns]
+        metric_names = np.array([base for base, _ in parts], dtype=object)
+        is_quarterly = np.array([suffix == "quarters" for _, suffix in parts], dtype=bool)
+
+        # per row: quarter/annual period_start and quarter code
+        ts = pd.DatetimeIndex(df.index).as_unit("ns").to_numpy()
+        months = ts.astype("datetime64[M]")
+        time_of_day = ts - ts.astype("datetime64[D]")
+        start_q = (months - np.timedelta64(2, "M")).astype("datetime64[ns]") + time_of_day
+        start_a = (months - np.timedelta64(11, "M")).astype("datetime64[ns]") + time_of_day
+        month_of_year = months.astype("int64") % 12 + 1
+        quarter_codes = np.array([QUARTER_CODES.get(m, "Q") for m in range(13)], dtype=object)[month_of_year]
+
+        flat_values = values.ravel()
+        keep = ~np.isnan(flat_values)
+        col_idx = np.repeat(np.arange(n_cols), n_rows)[keep]
+        row_idx = np.tile(np.arange(n_rows), n_cols)[keep]
+        quarterly = is_quarterly[col_idx]
+
+        df_long = pd.DataFrame({
+            "timestamp": ts[row_idx],
+            "period_start": np.where(quarterly, start_q[row_idx], start_a[row_idx]),
+            "period_end": ts[row_idx],
+            "period_code": np.where(quarterly, quarter_codes[row_idx], "A").astype(object),
+            "metric_name": metric_names[col_idx],
+            "metric_value": flat_values[keep],
+        })
+        df_long["symbol"] = symbol
+
+        df_long = df_long.sort_values(["timestamp", "metric_name"]).reset_index(drop=True)
+        return df_long
+
+    def _datetime_indexed(self, combined_df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of combined_df indexed by datetime, with NaT rows dropped."""
+        df = combined_df.copy()
+
+        # Ensure index is datetime; if not, try to coerce a timestamp column or the index
+        if not isinstance(df.index, pd.DatetimeIndex):
+            # prefer an explicit timestamp-like column if present
+            date_cols = [c for c in df.columns if "date" in c or "timestamp" in c]
+            if date_cols:
+                df[date_cols[0]] = pd.to_datetime(df[date_cols[0]], errors="coerce")
+                df = df.set_index(date_cols[0])
+            else:
+                # try converting the current index
+                try:
+                    df.index = pd.to_datetime(df.index, errors="coerce")
+                except Exception:
+                    pass
 
-    def login(self):
-        if self.is_logged_in():
-            logger.info("Already logged in.")
-            return
+        # drop rows where index is NaT
+        return df[~df.index.isna()].copy()
 
+    @instrumented("read_excel")
+    def read_excel(self, filepath, symbol, engine="stream", metrics=None):
+        """
+        Read file, parse sections (pnl, balance, quarters, cashflow),
+        combine them (wide), then melt to final long timeseries.
+
+        engine="stream" reads the "Data Sheet" XML straight out of the .xlsx zip
+        (config.xlsx_reader); engine="openpyxl" goes through pd.read_excel.
+        metrics limits the derived metrics computed (see combine_typed).
+        """
+        sections = self.read_sections(filepath, engine=engine)
+        if sections is None:
+            return pd.DataFrame()
+        return self.sections_to_timeseries(sections, symbol, metrics=metrics)
+
+    def read_sections(self, filepath, engine="stream"):
+        """Parsed {pnl, balance, quarters, cashflow} frames of an export, or None if it can't be read."""
         try:
-            r = self.session.get(self.login_url, headers=self.headers)
+            with METRICS.timer("read_data_sheet", engine=engine) as span:
+                if engine == "stream":
+                    dfs = read_data_sheet(filepath, sheet_name="Data Sheet")
+                elif engine == "openpyxl":
+                    dfs = pd.read_excel(filepath, sheet_name="Data Sheet", header=None)
+                else:
+                    raise ValueError(f"Unknown excel engine: {engine}")
+                span.bytes = os.path.getsize(filepath)
+                span.rows = len(dfs)
+        except FileNotFoundError:
+            logger.error(f"File not found: {filepath}")
+            return None
+        except Exception as e:
+            logger.error("Error while reading the Excel file: %s", e)
+            return None
+
+        return parse_sections(dfs)
+
+    def sections_to_timeseries(self, sections, symbol, metrics=None):
+        annual_combined = self.combine_typed({
+            "pnl": sections["pnl"],
+            "balance": sections["balance"],
+            "cashflow": sections["cashflow"]
+        }, period_code="A", metrics=metrics)
+
+        quarterly_combined = self.combine_typed({
+            "quarters": sections["quarters"]
+        }, period_code="Q", metrics=metrics)
+
+        combined_wide = pd.concat([annual_combined, quarterly_combined], axis=1)
+
+        final_ts = self.melt_combined_vectorized(combined_wide, symbol)
+
+        return final_ts
+
+    def read_excel_incremental(self, filepath, symbol, store, engine="stream"):
+        """
+        Incremental counterpart of read_excel against a TimeseriesStore.
+
+        The source sections are melted without derived metrics and diffed
+        against the stored rows; only the annual / quarterly periods that are
+        new or revised then go through combine (derived metrics) and melt.
+        Only new or revised rows are persisted (store.merge_symbol), and the
+        trends are recomputed only when an annual period changed.
+        Returns an IncrementalUpdate.
+        """
+        sections = self.read_sections(filepath, engine=engine)
+        if sections is None:
+            return IncrementalUpdate(symbol, pd.DataFrame(columns=LONG_COLUMNS), [], [], None)
+
+        stored = store.load_symbol(symbol)
+        source_rows = self.sections_to_timeseries(sections, symbol, metrics=[])
+        changed = store.diff(source_rows, stored)
+        annual = sorted(changed.loc[changed["period_code"] == "A", "period_end"].unique())
+        quarterly = sorted(changed.loc[changed["period_code"] != "A", "period_end"].unique())
+
+        if not annual and not quarterly:
+            logger.info(f"{symbol}: no new or revised periods")
+            return IncrementalUpdate(symbol, changed, annual, quarterly, None)
+
+        def rows_in(df, periods):
+            return df[df.index.isin(periods)] if df is not None else df
+
+        changed_sections = {
+            "pnl": rows_in(sections["pnl"], annual),
+            "balance": rows_in(sections["balance"], annual),
+            "cashflow": rows_in(sections["cashflow"], annual),
+            "quarters": rows_in(sections["quarters"], quarterly),
+        }
+        delta = store.diff(self.sections_to_timeseries(changed_sections, symbol), stored)
+        store.merge_symbol(symbol, delta)
+        logger.info(f"{symbol}: {len(delta)} new or revised rows in {len(annual)} annual / "
+                    f"{len(quarterly)} quarterly periods")
+
+        trends = None
+        if annual:
+            # growth and OPM / P/E stats only depend on annual rows
+            history = store.load_symbol(symbol, metrics=list(TREND_INPUTS), period_codes=["A"])
+            wide = history.pivot_table(index="period_end", columns="metric_name", values="metric_value",
+                                       observed=True).rename(columns=TREND_INPUTS)
+            if "sales_pnl" in wide.columns:
+                trends = calculate_trends(wide)
+        return IncrementalUpdate(symbol, delta, annual, quarterly, trends)
+
+    def combine(self, dfs, period_code="A"):
+        """Alias of combine_typed with the default float64 dtype and every derived metric."""
+        return self.combine_typed(dfs, period_code=period_code)
+
+    @instrumented("combine")
+    def combine_typed(self, dfs, period_code="A", dtype="float64", metrics=None, registry=DERIVED_METRICS):
+        """
+        Combine section frames into one wide frame with "<metric>_<section>"
+        columns plus the derived metrics. Sections from parse_sections are
+        already numeric, so dtypes are checked once per column and only
+        non-numeric columns go through the comma-stripping string path. Base
+        values and derived metrics share one preallocated `dtype` matrix.
+
+        Derived metrics come from `registry`: `metrics` limits them to the
+        requested names plus their dependencies (default: every metric of
+        period_code). Metrics whose source columns are missing are skipped.
+        """
+        frames = []
+        for name, df in dfs.items():
+            df = pd.DataFrame(df)
+            df.columns = df.columns.str.lower()
+            df = df.add_suffix(f"_{name}")
+            frames.append(df)
+
+        combined_df = pd.concat(frames, axis=1)
+
+        combined_df = combined_df.rename(columns={'price:_cashflow': 'price'})
+        if 'derived:_cashflow' in combined_df.columns:
+            combined_df = combined_df.drop('derived:_cashflow', axis=1)
+
+        columns = list(combined_df.columns)
+        requested = registry.names(period_code) if metrics is None else [
+            m for m in metrics if m in registry and registry[m].period_code == period_code
+        ]
+        planned = registry.resolve(requested)
+        # keep registration order for the output columns
+        derived = [m for m in registry.names(period_code) if m in planned]
+        # a derived metric replaces a source column of the same name
+        combined_df = combined_df.drop(columns=[col for col in columns if col in derived])
+        columns = list(combined_df.columns)
+        block = np.empty((len(combined_df), len(columns) + len(derived)), dtype=dtype)
+
+        for j, col in enumerate(columns):
+            values = combined_df.iloc[:, j]
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                block[:, j] = values.to_numpy(dtype=dtype, na_value=np.nan)
+            else:
+                cleaned = values.astype(str).str.replace(',', '', regex=False).str.strip()
+                block[:, j] = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=dtype, na_value=np.nan)
+
+        derived_pos = {name: len(columns) + j for j, name in enumerate(derived)}
+        evaluator = MetricEvaluator(
+            registry,
+            {col: block[:, j] for j, col in enumerate(columns)},
+            allocate=lambda name, like: block[:, derived_pos[name]],
+        )
+        results = evaluator.compute(derived)
+        computed = [name for name in derived if name in results]
+        if len(computed) < len(derived):
+            block = block[:, list(range(len(columns))) + [derived_pos[name] for name in computed]]
+
+        combined = pd.DataFrame(block, index=combined_df.index, columns=columns + computed)
+        for col in columns:
+            if isinstance(col, str) and 'report date' in col:
+                combined.insert(len(columns), 'timestamp', pd.to_datetime(combined_df[col], errors='coerce'))
+                break
+        combined['period_code'] = period_code
+        return combined
+
+
+class Screener(ScreenerBase):
+    def __init__(self, base_url="https://www.screener.in", reports_dir="reports", symbol_cache=None,
+                 report_store=None, session_path=None):
+        super().__init__(base_url=base_url, reports_dir=reports_dir, symbol_cache=symbol_cache,
+                         report_store=report_store, session_path=session_path)
+        # requests and the cookie file are only touched once something is fetched
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._pool = None
+
+    @property
+    def session(self):
+        """The main ScreenerSession, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.new_session()
+        return self._session
+
+    def _cookie_store(self, slot=None):
+        if not self.session_path:
+            return None
+        if slot is None:
+            return CookieJarStore(self.session_path)
+        root, ext = os.path.splitext(self.session_path)
+        return CookieJarStore(f"{root}-{slot}{ext}")
+
+    def new_session(self, slot=None):
+        """ScreenerSession restored from its cookie file (slot None: the main session, else a pool slot)."""
+        from config.http_session import ScreenerSession
+
+        session = ScreenerSession(self._cookie_store(slot))
+        session.headers.update(self.headers)
+        if session.cookie_store and session.cookie_store.load(session.cookies):
+            logger.info(f"Restored session from {session.cookie_store.path}")
+        return session
+
+    def session_pool(self, size=4):
+        """
+        SessionPool of `size` independently authenticated sessions (each
+        persisted to its own cookie file) for fetch workers to check out.
+        """
+        if self._pool is None or self._pool.size != size:
+            def create(slot):
+                session = self.new_session(slot)
+                self.login(session)
+                return session
+            self._pool = SessionPool(create, size=size)
+        return self._pool
+
+    @staticmethod
+    def _sessionid(session):
+        cookie = session_cookie(session.cookies)
+        return cookie.value if cookie else None
+
+    def is_logged_in(self, session=None):
+        return self._sessionid(session or self.session) is not None
+
+    @instrumented("login")
+    def login(self, session=None, stale=None):
+        """
+        Log session (default: the main one) in unless it already has a live
+        sessionid. stale is a sessionid the server rejected: it is dropped and
+        replaced, unless another thread has replaced it already.
+        """
+        session = session or self.session
+        with session.login_lock:
+            current = self._sessionid(session)
+            if current is not None and current != stale:
+                logger.info("Already logged in.")
+                return
+            if current is not None:
+                drop_session_cookie(session.cookies)
+                if session.cookie_store:
+                    session.cookie_store.clear()
+            self._login(session)
+
+    def _login(self, session):
+        import requests
+
+        try:
+            r = session.get(self.login_url, headers=self.headers)
             r.raise_for_status()
-            soup = BeautifulSoup(r.text, "html.parser")
 
-            input_token = soup.find("input", {"name": "csrfmiddlewaretoken"})
+            input_token = find_tag([r.content], *CSRF_INPUT)
             if input_token:
                 self.csrfmiddlewaretoken = input_token.get("value")
                 logger.info(f"middleware token: {self.csrfmiddlewaretoken}")
@@ -58,12 +467,14 @@ class Screener:
             payload = {"username": self.email, "password": self.password,
                        "csrfmiddlewaretoken": self.csrfmiddlewaretoken}
 
-            login_resp = self.session.post(self.login_url, data=payload,
-                                           headers={**self.headers, "Referer": self.login_url})
+            login_resp = session.post(self.login_url, data=payload,
+                                      headers={**self.headers, "Referer": self.login_url})
             login_resp.raise_for_status()
             logger.info(login_resp.status_code)
-            if "sessionid" in self.session.cookies:
-                logger.info(f"Session ID: {self.session.cookies['sessionid']}")
+            if self.is_logged_in(session):
+                logger.info(f"Session ID: {self._sessionid(session)}")
+                if session.cookie_store:
+                    session.cookie_store.save(session.cookies)
 
             else:
                 logger.error("Login failed, sessionid not found.")
@@ -74,17 +485,58 @@ class Screener:
         except Exception as e:
             logger.error(f"Unable to login: {e}")
 
-    def fetch_symbol(self, symbol):
+    def _send(self, session, method, url, headers=None, csrf=False, **kwargs):
+        """
+        session.request that logs in again and retries once when the session
+        was rejected. csrf=True adds the X-CSRFToken header from the current
+        csrftoken cookie (which a re-login may have replaced).
+        """
+        stale = self._sessionid(session)
+        for attempt in (0, 1):
+            request_headers = dict(headers or {})
+            if csrf:
+                csrftoken = session.cookies.get("csrftoken")
+                if not csrftoken:
+                    raise Exception("❌ csrftoken not found in cookies")
+                request_headers["X-CSRFToken"] = csrftoken  # Django requires this
+            resp = session.request(method, url, headers=request_headers, **kwargs)
+            if attempt or not self.login_required(resp):
+                return resp
+            resp.close()
+            logger.warning(f"Session rejected ({resp.status_code} at {resp.url}), logging in again")
+            METRICS.inc("screener_relogin_total")
+            self.login(session, stale=stale)
+
+    @instrumented("fetch_symbol")
+    def fetch_symbol(self, symbol, session=None):
+        """Company page URL for symbol, searched on session (default: the main one); None if unknown."""
+        cached = self.symbol_cache.get(symbol) if self.symbol_cache else MISS
+        METRICS.inc("screener_symbol_cache_total", result="miss" if cached is MISS else "hit")
+        if cached is not MISS:
+            logger.info(f"Cached company url for {symbol}: {cached}")
+            return cached
+
+        import requests
+
         try:
             param = {
                 "q": symbol,
                 "v": 3,
                 "fts": 1
             }
-            data = self.session.get(self.symbol_url, params=param)
+            data = self._send(session or self.session, "GET", self.symbol_url, params=param)
             data.raise_for_status()
-            company_url = (data.json()[0]['url'])
+            results = data.json()
+            if not results:
+                if self.symbol_cache:
+                    # unknown ticker: remember for negative_ttl so it doesn't hit search again
+                    self.symbol_cache.put(symbol, None)
+                logger.info(f"No company found for symbol {symbol}")
+                return None
+            company_url = (results[0]['url'])
             logger.info(f"Fetched company url: {company_url}")
+            if self.symbol_cache:
+                self.symbol_cache.put(symbol, company_url)
             return company_url
 
         except requests.exceptions.RequestException as e:
@@ -95,288 +547,165 @@ class Screener:
             logger.error(f"Something went wrong while fetching symbol URL: {e}")
         return None
 
+    def warm_symbol_cache(self, symbols, max_concurrency=8):
+        """
+        Pre-resolve company URLs for every symbol not already cached.
+        Returns {symbol: company_url or None when it could not be resolved}.
+        """
+        if not self.symbol_cache:
+            raise ValueError("warm_symbol_cache needs a symbol_cache")
+        todo = self.symbol_cache.missing(symbols)
+        logger.info(f"Resolving {len(todo)} of {len(symbols)} symbols")
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="screener-warm") as executor:
+            list(executor.map(self.fetch_symbol, todo))
+
+        resolved = {}
+        for symbol in symbols:
+            company_url = self.symbol_cache.get(symbol)
+            resolved[symbol] = None if company_url is MISS else company_url
+        return resolved
+
     def fetch_data(self, symbol):
         try:
             self.login()
-
-            company_url = self.fetch_symbol(symbol=symbol)
-            url = f"https://www.screener.in{company_url}"
-            logger.info(url)
-            res = self.session.get(url)
-            res.raise_for_status()
-
-            soup = BeautifulSoup(res.text, "html.parser")
-            btn = soup.find("button", attrs={"aria-label": "Export to Excel"})
-            if not btn or "formaction" not in btn.attrs:
-                raise Exception("❌ Could not find export button on page")
-
-            export_url = f"https://www.screener.in{btn['formaction']}"
-            logger.info(f"Downloading from {export_url}")
-
-            csrftoken = self.session.cookies.get("csrftoken")
-            if not csrftoken:
-                raise Exception("❌ csrftoken not found in cookies")
-
-            headers = {
-                **self.headers,
-                "Referer": url,  # must match company page
-                "X-CSRFToken": csrftoken,  # Django requires this
-            }
-
-            resp = self.session.post(
-                export_url,
-                headers=headers,
-                cookies=self.session.cookies,
-                stream=True
-            )
-            logger.info(resp.status_code)
-
-            if resp.status_code != 200:
-                raise Exception(f"❌ Failed to download file. Status {resp.status_code}: {resp.text[:200]}")
-
-            filepath = f"reports/export_{company_url.split('/')[2]}.xlsx"
-            with open(filepath, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-
+            filepath = self._download_export(symbol)
+            self.fetch_errors.pop(symbol, None)
             return filepath
         except Exception as e:
             logger.error(f"Something went wrong while fetching data: {e}")
+            self.fetch_errors[symbol] = str(e)
         return None
 
-    def melt_combined(self, combined_df: pd.DataFrame, symbol: str) -> pd.DataFrame:
-        """
-        Take the wide combined DataFrame (index = dates, columns like
-        'adjusted equity shares in cr_cashflow', 'borrowings_balance', 'sales_quarters', ...)
-        and melt it into the final long timeseries format:
-        timestamp, period_start, period_end, period_code, metric_name, metric_value, symbol
-        """
-        if combined_df is None or combined_df.empty:
-            return pd.DataFrame(columns=[
-                "timestamp", "period_start", "period_end", "period_code", "metric_name", "metric_value", "symbol"
-            ])
-
-        df = combined_df.copy()
-
-        # Ensure index is datetime; if not, try to coerce a timestamp column or the index
-        if not isinstance(df.index, pd.DatetimeIndex):
-            # prefer an explicit timestamp-like column if present
-            date_cols = [c for c in df.columns if "date" in c or "timestamp" in c]
-            if date_cols:
-                df[date_cols[0]] = pd.to_datetime(df[date_cols[0]], errors="coerce")
-                df = df.set_index(date_cols[0])
-            else:
-                # try converting the current index
-                try:
-                    df.index = pd.to_datetime(df.index, errors="coerce")
-                except Exception:
-                    pass
-
-        # drop rows where index is NaT
-        df = df[~df.index.isna()].copy()
-
-        # Reset index to get timestamp column
-        df_reset = df.reset_index()
-        df_reset = df_reset.rename(columns={df_reset.columns[0]: "timestamp"})
-
-        # Melt into long form
-        df_long = df_reset.melt(id_vars=["timestamp"], var_name="metric", value_name="metric_value")
-
-        # Convert numeric where possible and drop NaNs
-        df_long["metric_value"] = pd.to_numeric(df_long["metric_value"], errors="coerce")
-        df_long = df_long.dropna(subset=["metric_value", "timestamp"]).copy()
-
-        # Split metric into base name + suffix (pnl | quarters | balance | cashflow)
-        def split_metric(col: str):
-            m = re.match(r"(?P<base>.+)_(?P<suffix>pnl|quarters|balance|cashflow)$", col)
-            if m:
-                return m.group("base").strip(), m.group("suffix")
-            # no suffix -> assume annual (A)
-            return col.strip(), None
-
-        parts = df_long["metric"].apply(split_metric)
-        df_long[["metric_name", "suffix"]] = pd.DataFrame(parts.tolist(), index=df_long.index)
-
-        # Determine period code
-        df_long["period_code"] = df_long["suffix"].map({
-            "quarters": "Q",
-            "pnl": "A",
-            "balance": "A",
-            "cashflow": "A"
-        }).fillna("A")
-
-        # Ensure timestamp is datetime
-        df_long["timestamp"] = pd.to_datetime(df_long["timestamp"], errors="coerce")
-
-        # Compute period_start and period_end
-        mask_q = df_long["period_code"] == "Q"
-        mask_a = df_long["period_code"] == "A"
-
-        # Quarter start (vectorized)
-        if mask_q.any():
-            df_long.loc[mask_q, "period_start"] = df_long['timestamp'].apply(
-                lambda x: x - relativedelta(months=2, day=1))
-        # Annual start = Jan 1 of that year (vectorized)
-        if mask_a.any():
-            df_long.loc[mask_a, "period_start"] = df_long['timestamp'].apply(
-                lambda x: x - relativedelta(months=11, day=1))
-            # period_end is the timestamp itself
-        df_long["period_end"] = df_long["timestamp"]
-        df_long.loc[mask_q, 'period_code'] = np.where(
-            df_long.loc[mask_q, 'period_end'].dt.month == 6, "Q1",
-            np.where(df_long.loc[mask_q, 'period_end'].dt.month == 9, "Q2",
-                     np.where(df_long.loc[mask_q, 'period_end'].dt.month == 12, "Q3",
-                              np.where(df_long.loc[mask_q, 'period_end'].dt.month == 3, "Q4", "Q")))
-        )
-        # Final columns & cleanup
-        df_long = df_long[[
-            "timestamp", "period_start", "period_end", "period_code", "metric_name", "metric_value"
-        ]].copy()
-        df_long["symbol"] = symbol
-
-        # sort for nicer output
-        df_long = df_long.sort_values(["timestamp", "metric_name"]).reset_index(drop=True)
-        return df_long
-
-    def read_excel(self, filepath, symbol):
+    def fetch_many(self, symbols, max_concurrency=8, requests_per_second=5.0, sessions=1):
         """
-        Read file, parse sections (pnl, balance, quarters, cashflow),
-        combine them (wide), then melt to final long timeseries.
+        Download exports for many symbols. Up to max_concurrency downloads run
+        at once on a connection pool of the same size, and requests to each
+        host are spaced to requests_per_second. With sessions > 1 the workers
+        check out sessions from session_pool(sessions) instead of sharing the
+        main one. Yields a FetchResult per symbol as soon as it finishes
+        (completion order).
         """
+        from config.rate_limit import HostRateLimiter, RateLimitedAdapter
+
+        adapter = RateLimitedAdapter(HostRateLimiter(requests_per_second), pool_maxsize=max_concurrency)
+        if sessions > 1:
+            pool = self.session_pool(sessions)
+            pool.warm()
+            targets = pool.sessions
+        else:
+            pool = None
+            self.login()
+            targets = [self.session]
+        # the rate limit applies to this call only: the sessions get their own adapters back afterwards
+        previous = [(session, session.adapters.copy()) for session in targets]
+        for session in targets:
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="screener-fetch")
         try:
-            dfs = pd.read_excel(filepath, sheet_name="Data Sheet", header=None)
-        except FileNotFoundError:
-            logger.error(f"File not found: {filepath}")
-            return pd.DataFrame()
+            futures = [executor.submit(self._timed_fetch, symbol, pool) for symbol in symbols]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for session, adapters in previous:
+                session.adapters = adapters
+            adapter.close()
+
+    def _timed_fetch(self, symbol, pool=None):
+        start = time.perf_counter()
+        try:
+            if pool is None:
+                filepath = self._download_export(symbol)
+            else:
+                with pool.checkout() as session:
+                    filepath = self._download_export(symbol, session)
+            error = None
         except Exception as e:
-            logger.error("Error while reading the Excel file: %s", e)
-            return pd.DataFrame()
-
-        pnl_df = parse_section(dfs, "PROFIT & LOSS", "Quarters", "PNL")
-        bal_sh_df = parse_section(dfs, "BALANCE SHEET", "CASH FLOW:", "Balance Sheet")
-        q_df = parse_section(dfs, "Quarters", "BALANCE SHEET", "Quarters")
-        cash_df = parse_section(dfs, "CASH FLOW:", " Adjusted Equity Shares in Cr", "Cash Flow")
-
-        annual_combined = self.combine({
-            "pnl": pnl_df,
-            "balance": bal_sh_df,
-            "cashflow": cash_df
-        }, period_code="A")
+            logger.error(f"Something went wrong while fetching data for {symbol}: {e}")
+            filepath, error = None, str(e)
+        return FetchResult(symbol, filepath, error, time.perf_counter() - start)
+
+    def _download_export(self, symbol, session=None):
+        session = session or self.session
+        company_url = self.fetch_symbol(symbol=symbol, session=session)
+        if not company_url:
+            raise Exception(f"❌ Could not resolve company url for {symbol}")
+        url = f"{self.base_url}{company_url}"
+        logger.info(url)
+        with METRICS.timer("company_page") as span:
+            with self._send(session, "GET", url, stream=True) as res:
+                res.raise_for_status()
+                chunks = _counted(res.iter_content(chunk_size=16384), span)
+                btn = find_tag(chunks, *EXPORT_BUTTON)
+                # the rest of the page is read unparsed, so the connection goes back to the pool
+                for _ in chunks:
+                    pass
 
-        quarterly_combined = self.combine({
-            "quarters": q_df
-        }, period_code="Q")
+        if not btn or "formaction" not in btn:
+            raise Exception("❌ Could not find export button on page")
 
-        combined_wide = pd.concat([annual_combined, quarterly_combined], axis=1)
+        export_url = f"{self.base_url}{btn['formaction']}"
+        logger.info(f"Downloading from {export_url}")
 
-        final_ts = self.melt_combined(combined_wide, symbol)
-
-        return final_ts
+        headers = {
+            **self.headers,
+            "Referer": url,  # must match company page
+        }
 
-    def combine(self, dfs, period_code="A"):
-        frames = []
-        for name, df in dfs.items():
-            df = pd.DataFrame(df)
-            df.columns = df.columns.str.lower()
-            df = df.add_suffix(f"_{name}")
-            frames.append(df)
+        with METRICS.timer("export_download") as span:
+            resp = self._send(session, "POST", export_url, headers=headers, csrf=True, stream=True)
+            logger.info(resp.status_code)
 
-        combined_df = pd.concat(frames, axis=1)
+            if resp.status_code != 200 or self.login_required(resp):
+                raise Exception(f"❌ Failed to download file. Status {resp.status_code}: {resp.text[:200]}")
 
-        combined_df = combined_df.rename(columns={'price:_cashflow': 'price'})
-        if 'derived:_cashflow' in combined_df.columns:
-            combined_df = combined_df.drop('derived:_cashflow', axis=1)
+            os.makedirs(self.reports_dir, exist_ok=True)
+            filepath = os.path.join(self.reports_dir, f"export_{company_url.split('/')[2]}.xlsx")
+            with open(filepath, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=8192):
+                    if chunk:
+                        f.write(chunk)
+                        span.bytes += len(chunk)
 
-        for col in combined_df.columns:
-            combined_df[col] = (
-                combined_df[col]
-                .astype(str)
-                .str.replace(',', '', regex=False)
-                .str.strip()
-            )
-            try:
-                combined_df[col] = pd.to_numeric(combined_df[col], errors='coerce')
-            except Exception:
-                pass
-
-        for col in combined_df.columns:
-            if 'report date' in col:
-                combined_df['timestamp'] = pd.to_datetime(combined_df[col], errors='coerce')
-                break
+        return filepath
 
-        if period_code == 'A':
-            combined_df['expenses_pnl'] = (
-                    combined_df['raw material cost_pnl'] +
-                    combined_df['power and fuel_pnl'] +
-                    combined_df['other mfr. exp_pnl'] +
-                    combined_df['employee cost_pnl'] +
-                    combined_df['selling and admin_pnl'] +
-                    combined_df['other expenses_pnl'] +
-                    -1 * combined_df['change in inventory_pnl']
-            )
-
-            combined_df['operating_profit_pnl'] = combined_df['sales_pnl'] - combined_df['expenses_pnl']
-
-            combined_df['dividend_payout_pnl'] = np.where(
-                combined_df['net profit_pnl'] > 0,
-                round((combined_df['dividend amount_pnl'] / combined_df['net profit_pnl']) * 100, 2),
-                0
-            )
-
-            combined_df['EPS'] = np.where(
-                combined_df['adjusted equity shares in cr_cashflow'] > 0,
-                round(combined_df['net profit_pnl'] / combined_df['adjusted equity shares in cr_cashflow'], 2),
-                0
-            )
-
-            combined_df['yearly OPM'] = np.where(
-                combined_df['operating_profit_pnl'] > 0,
-                np.round(
-                    round((combined_df['operating_profit_pnl'] / combined_df['sales_pnl']) * 100, 2)),
-                0
-            )
-
-            combined_df['ROE'] = np.where(
-                (combined_df['equity share capital_balance'] + combined_df['reserves_balance']) > 0,
-                np.round(
-                    round((combined_df['net profit_pnl'] / (
-                            combined_df['equity share capital_balance'] + combined_df['reserves_balance'])) * 100, 2)),
-                0
-            )
-
-            combined_df['price_to_earning'] = np.where(
-                combined_df['EPS'] > 0,
-                round(combined_df['price'] / combined_df['EPS'], 2),
-                0
-            )
-
-            combined_df['working_capital'] = (
-                    combined_df['other assets_balance'] - combined_df['other liabilities_balance']
-            )
-
-            combined_df['debtor_days'] = np.where(
-                combined_df['sales_pnl'] > 0,
-                round(combined_df['receivables_balance'] / (combined_df['sales_pnl'] / 365), 2),
-                0
-            )
-
-            combined_df['inventory_turnover'] = np.where(
-                combined_df['inventory_balance'] > 0,
-                round(combined_df['sales_pnl'] / combined_df['inventory_balance'], 2),
-                0
-            )
-
-        elif period_code == 'Q':
-            combined_df['quarterly OPM_quarters'] = np.where(
-                combined_df['sales_quarters'] > 0,
-                np.round(
-                    combined_df['operating profit_quarters'] / combined_df['sales_quarters'] * 100),
-                0
-            )
-
-        combined_df['period_code'] = period_code
-        return combined_df
+    def get_timeseries(self, symbol, max_age=None):
+        """
+        Long-form timeseries for symbol through the report store. While the last
+        download is younger than max_age (default: the store's) the cached
+        timeseries is returned without touching the network; otherwise the
+        export is refetched and only re-parsed when its bytes changed.
+        """
+        store = self.report_store
+        record = store.latest(symbol)
+        if record and store.is_fresh(symbol, max_age):
+            cached = store.load_timeseries(record["sha256"], symbol)
+            if cached is not None:
+                logger.info(f"Using cached timeseries for {symbol} ({record['sha256'][:12]})")
+                return cached
+
+        filepath = self.fetch_data(symbol)
+        if not filepath:
+            if record:
+                cached = store.load_timeseries(record["sha256"], symbol)
+                if cached is not None:
+                    logger.warning(f"Refetch failed for {symbol}, serving stale timeseries")
+                    return cached
+            return pd.DataFrame(columns=LONG_COLUMNS)
+
+        sha, changed = store.record(symbol, filepath)
+        if not changed:
+            cached = store.load_timeseries(sha, symbol)
+            if cached is not None:
+                logger.info(f"Export for {symbol} unchanged ({sha[:12]}), skipping parse")
+                return cached
+
+        timeseries = self.read_excel(filepath, symbol)
+        if not timeseries.empty:
+            store.save_timeseries(sha, timeseries)
+        return timeseries
 
 
 if __name__ == "__main__":
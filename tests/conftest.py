@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_screener import FakeScreener  # noqa: E402
+
+EXPORT_BYTES = b"PK fake export workbook"
+
+
+@pytest.fixture
+def fake_screener(monkeypatch):
+    """FakeScreener knowing ACC, TCS and INFY, with Screener credentials in the environment."""
+    monkeypatch.setenv("SCREENER_EMAIL", "user@example.com")
+    monkeypatch.setenv("SCREENER_PASSWORD", "secret")
+    server = FakeScreener(EXPORT_BYTES, symbols={"ACC", "TCS", "INFY"})
+    server.base_url = server.start()
+    yield server
+    server.stop()
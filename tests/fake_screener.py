@@ -0,0 +1,151 @@
+"""
+Local stand-in for the screener.in endpoints used by Screener:
+
+    GET  /login/                       login form with csrfmiddlewaretoken, sets csrftoken
+    POST /login/                       sets a fresh sessionid when the token matches
+    GET  /api/company/search/?q=SYM    [{"url": "/company/SYM/consolidated/"}] or [] for unknown symbols
+    GET  /company/SYM/consolidated/    page with the "Export to Excel" button
+    POST /user/company/export/SYM/     the export workbook (needs a live sessionid + X-CSRFToken;
+                                       redirects to /login/ otherwise)
+
+    server = FakeScreener(export_bytes, symbols={"ACC", "TCS"}, latency=0.05, delays={"TCS": 0.2})
+    base_url = server.start()
+    ...
+    server.stop()
+
+`server.hits` counts requests per endpoint so callers can assert how much
+upstream traffic a code path generated, and `server.requests` lists
+(time.monotonic(), endpoint) in arrival order. `delays` holds up the export
+of particular symbols by that many seconds. `server.expire_sessions()` invalidates
+every sessionid issued so far, as a server-side session expiry would.
+"""
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CSRF_TOKEN = "fake-csrf-token"
+SESSION_PREFIX = "fake-session-"
+
+LOGIN_PAGE = f"""<html><body><form method="post">
+<input type="hidden" name="csrfmiddlewaretoken" value="{CSRF_TOKEN}">
+<input name="username"><input name="password" type="password">
+</form></body></html>"""
+
+COMPANY_PAGE = """<html><head><title>{symbol}</title></head><body>
+<div class="company-info">{padding}</div>
+<form method="post"><button aria-label="Export to Excel" formaction="/user/company/export/{symbol}/">Export</button></form>
+</body></html>"""
+
+
+class FakeScreener:
+    def __init__(self, export_bytes, symbols=None, latency=0.0, page_padding=0, delays=None):
+        self.export_bytes = export_bytes
+        self.symbols = {s.upper() for s in symbols} if symbols is not None else None
+        self.latency = latency
+        self.page_padding = page_padding
+        self.delays = {s.upper(): seconds for s, seconds in (delays or {}).items()}
+        self.hits = Counter()
+        self.requests = []
+        self._lock = threading.Lock()
+        self.sessions = set()
+        self._session_ids = itertools.count(1)
+        self._server = None
+
+    def start(self, host="127.0.0.1", port=0):
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def hit(self, endpoint):
+        with self._lock:
+            self.hits[endpoint] += 1
+            self.requests.append((time.monotonic(), endpoint))
+
+    def expire_sessions(self):
+        self.sessions.clear()
+
+    def known(self, symbol):
+        return self.symbols is None or symbol.upper() in self.symbols
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", content_type="text/html", cookies=(), headers=()):
+                if isinstance(body, str):
+                    body = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                for cookie in cookies:
+                    self.send_header("Set-Cookie", f"{cookie}; Path=/")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _logged_in(self):
+                cookies = dict(c.strip().partition("=")[::2] for c in self.headers.get("Cookie", "").split(";"))
+                return cookies.get("sessionid") in fake.sessions
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if parts.path == "/login/":
+                    fake.hit("login_page")
+                    self._send(200, LOGIN_PAGE, cookies=[f"csrftoken={CSRF_TOKEN}"])
+                elif parts.path == "/api/company/search/":
+                    fake.hit("search")
+                    symbol = parse_qs(parts.query).get("q", [""])[0].strip()
+                    found = [{"url": f"/company/{symbol.upper()}/consolidated/"}] if fake.known(symbol) else []
+                    self._send(200, json.dumps(found), content_type="application/json")
+                elif parts.path.startswith("/company/"):
+                    fake.hit("company_page")
+                    symbol = parts.path.split("/")[2]
+                    padding = "<p>filler</p>" * fake.page_padding
+                    self._send(200, COMPANY_PAGE.format(symbol=symbol, padding=padding))
+                else:
+                    self._send(404, "not found")
+
+            def do_POST(self):
+                parts = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if parts.path == "/login/":
+                    fake.hit("login")
+                    if parse_qs(body).get("csrfmiddlewaretoken") == [CSRF_TOKEN]:
+                        session_id = f"{SESSION_PREFIX}{next(fake._session_ids)}"
+                        fake.sessions.add(session_id)
+                        self._send(200, "welcome", cookies=[f"sessionid={session_id}"])
+                    else:
+                        self._send(403, "bad csrf token")
+                elif parts.path.startswith("/user/company/export/"):
+                    fake.hit("export")
+                    time.sleep(fake.delays.get(parts.path.split("/")[4].upper(), 0))
+                    if not self._logged_in():
+                        fake.hit("export_denied")
+                        self._send(302, "login required", headers=[("Location", f"/login/?next={parts.path}")])
+                    elif self.headers.get("X-CSRFToken") != CSRF_TOKEN:
+                        self._send(403, "bad csrf token")
+                    else:
+                        self._send(200, fake.export_bytes,
+                                   content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                else:
+                    self._send(404, "not found")
+
+        return Handler
@@ -0,0 +1,122 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from async_screener import AsyncScreener
+from config.jobs import OK
+from screener import LONG_COLUMNS
+
+
+def _timeseries(symbol):
+    return pd.DataFrame([[pd.Timestamp("2024-03-31"), pd.Timestamp("2023-04-01"), pd.Timestamp("2024-03-31"), "A",
+                          "sales", 100.0, symbol]], columns=LONG_COLUMNS)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with TestClient(app.app) as client:
+        yield client
+
+
+def test_job_results_read_the_report_store_only(client, tmp_path, monkeypatch):
+    async def no_fetch(self, *args, **kwargs):
+        raise AssertionError("job results must not refetch")
+
+    monkeypatch.setattr(AsyncScreener, "get_timeseries", no_fetch)
+    # more symbols than /timeseries accepts, all long past the store's max_age
+    symbols = [f"SYM{i}" for i in range(app.TIMESERIES_MAX_SYMBOLS + 1)]
+    stored = symbols[::100]
+    store = client.portal.call(app.get_screener).report_store
+    for symbol in stored:
+        export = tmp_path / f"export_{symbol}.xlsx"
+        export.write_bytes(symbol.encode())
+        sha, _ = store.record(symbol, str(export))
+        store.save_timeseries(sha, _timeseries(symbol))
+    store._conn.execute("UPDATE reports SET downloaded_at = ?", (time.time() - 30 * 24 * 3600,))
+
+    job_id, _ = app.job_runner.store.create(symbols)
+    for symbol in symbols:
+        app.job_runner.store.update(job_id, symbol, OK, rows=1)
+
+    resp = client.get(f"/jobs/{job_id}/results")
+    assert resp.status_code == 200
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [row["symbol"] for row in rows] == stored
+
+
+def test_failed_screener_build_is_retried(client, monkeypatch):
+    create = app._create_screener
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("cache unreadable")
+        return create()
+
+    async def rebuild():
+        await (await app.get_screener()).aclose()
+        app.screener_api = app._screener_ready = None
+        with pytest.raises(RuntimeError):
+            await app.get_screener()
+        return await app.get_screener()
+
+    monkeypatch.setattr(app, "_create_screener", flaky)
+    assert isinstance(client.portal.call(rebuild), AsyncScreener)
+    assert len(calls) == 2
+
+
+def test_weak_if_none_match_gets_304(client, monkeypatch):
+    calls = []
+
+    async def fetch_and_parse(symbol, parse=None):
+        calls.append(symbol)
+        return b'{"symbol": "ETAG", "data": []}'
+
+    monkeypatch.setattr(app, "_fetch_and_parse", fetch_and_parse)
+    app.response_cache.invalidate("ETAG")
+
+    first = client.get("/screener/ETAG")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.content == b'{"symbol": "ETAG", "data": []}'
+
+    cached = client.get("/screener/ETAG", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert calls == ["ETAG"]
+
+
+@pytest.mark.parametrize("symbols", [[], ["", "  "]])
+def test_job_without_symbols_is_rejected(client, symbols):
+    resp = client.post("/jobs", json={"symbols": symbols})
+    assert resp.status_code == 422
+
+
+def test_failed_job_item_records_the_fetch_error(client, monkeypatch):
+    async def login(self, stale=None):
+        return True
+
+    async def download_export(self, symbol):
+        raise Exception(f"Could not resolve company url for {symbol}")
+
+    monkeypatch.setattr(AsyncScreener, "login", login)
+    monkeypatch.setattr(AsyncScreener, "_download_export", download_export)
+
+    job = client.post("/jobs", json={"symbols": [" nope ", ""]}).json()
+    assert job["total"] == 1
+    for _ in range(200):
+        job = client.get(f"/jobs/{job['job_id']}").json()
+        if job["status"] == "done":
+            break
+        time.sleep(0.01)
+
+    [item] = job["items"]
+    assert item["symbol"] == "NOPE"
+    assert item["status"] == "failed"
+    assert item["error"] == "Could not resolve company url for NOPE"
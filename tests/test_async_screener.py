@@ -0,0 +1,36 @@
+import asyncio
+
+from async_screener import AsyncScreener
+from conftest import EXPORT_BYTES
+from screener import Screener
+
+
+def test_async_screener_has_no_sync_fetch_helpers():
+    # they would call the coroutine login / fetch_symbol / _download_export without awaiting them
+    screener = AsyncScreener(symbol_cache=False, report_store=False, session_path=False)
+    try:
+        assert not isinstance(screener, Screener)
+        for name in ("fetch_many", "warm_symbol_cache", "session_pool", "new_session", "session", "_send"):
+            assert not hasattr(screener, name), name
+    finally:
+        asyncio.run(screener.aclose())
+
+
+def test_concurrent_fetch_data_on_a_cold_client(fake_screener, tmp_path):
+    symbols = ["ACC", "TCS", "INFY", "NOPE"]
+
+    async def fetch_all():
+        screener = AsyncScreener(base_url=fake_screener.base_url, reports_dir=str(tmp_path), symbol_cache=False,
+                                 report_store=False, session_path=False)
+        try:
+            return await asyncio.gather(*(screener.fetch_data(symbol) for symbol in symbols))
+        finally:
+            await screener.aclose()
+
+    paths = dict(zip(symbols, asyncio.run(fetch_all())))
+
+    assert fake_screener.hits["login"] == 1
+    assert paths["NOPE"] is None
+    for symbol in ("ACC", "TCS", "INFY"):
+        with open(paths[symbol], "rb") as f:
+            assert f.read() == EXPORT_BYTES
@@ -0,0 +1,73 @@
+import os
+
+from conftest import EXPORT_BYTES
+from screener import Screener
+
+
+def _screener(server, tmp_path):
+    return Screener(base_url=server.base_url, reports_dir=str(tmp_path), symbol_cache=False, report_store=False,
+                    session_path=False)
+
+
+def test_fetch_many_reports_each_symbol(fake_screener, tmp_path):
+    results = {r.symbol: r for r in _screener(fake_screener, tmp_path).fetch_many(
+        ["ACC", "TCS", "NOPE"], requests_per_second=0)}
+
+    assert set(results) == {"ACC", "TCS", "NOPE"}
+    for symbol in ("ACC", "TCS"):
+        assert results[symbol].ok
+        with open(results[symbol].filepath, "rb") as f:
+            assert f.read() == EXPORT_BYTES
+    assert not results["NOPE"].ok
+    assert results["NOPE"].filepath is None
+    assert "NOPE" in results["NOPE"].error
+
+
+def test_fetch_many_yields_in_completion_order(fake_screener, tmp_path):
+    fake_screener.delays = {"ACC": 0.5}
+    order = [r.symbol for r in _screener(fake_screener, tmp_path).fetch_many(
+        ["ACC", "TCS", "INFY"], requests_per_second=0)]
+
+    assert order[-1] == "ACC"
+    assert sorted(order) == ["ACC", "INFY", "TCS"]
+
+
+def test_fetch_many_spaces_requests(fake_screener, tmp_path):
+    rate = 20.0
+    screener = _screener(fake_screener, tmp_path)
+    screener.login()  # logging in is not rate limited; only the fetches are measured
+    fake_screener.requests.clear()
+
+    results = list(screener.fetch_many(["ACC", "TCS", "INFY"], max_concurrency=3, requests_per_second=rate))
+
+    assert all(r.ok for r in results)
+    times = sorted(t for t, _ in fake_screener.requests)
+    assert len(times) == 9  # search, company page and export per symbol
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) > 0.7 / rate
+    assert times[-1] - times[0] > 0.9 * 8 / rate
+
+
+def test_fetch_many_restores_session_adapters(fake_screener, tmp_path):
+    screener = _screener(fake_screener, tmp_path)
+    before = dict(screener.session.adapters)
+
+    list(screener.fetch_many(["ACC"], requests_per_second=5))
+
+    assert dict(screener.session.adapters) == before
+    assert os.path.exists(os.path.join(tmp_path, "export_ACC.xlsx"))
+
+
+def test_unknown_symbol_is_negatively_cached_without_error(fake_screener, tmp_path, caplog):
+    from config.symbol_cache import SymbolCache
+
+    screener = Screener(base_url=fake_screener.base_url, reports_dir=str(tmp_path), report_store=False,
+                        symbol_cache=SymbolCache(path=str(tmp_path / "symbols.sqlite3")), session_path=False)
+
+    with caplog.at_level("INFO"):
+        assert screener.fetch_symbol("NOPE") is None
+        assert screener.fetch_symbol("NOPE") is None
+
+    assert fake_screener.hits["search"] == 1
+    assert not [r for r in caplog.records if r.levelname == "ERROR"]
+    assert "No company found for symbol NOPE" in caplog.text
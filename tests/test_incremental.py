@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.synthetic import data_sheet_grid, write_workbook
+from config.timeseries_store import KEY_COLUMNS, TimeseriesStore
+from screener import Screener
+
+SYMBOL = "SYN"
+
+
+def _sorted(df):
+    df = df.copy()
+    for col in ("period_code", "metric_name", "symbol"):
+        df[col] = df[col].astype(object)
+    return df.sort_values(KEY_COLUMNS).reset_index(drop=True)
+
+
+def test_incremental_update_stores_only_the_changed_period(tmp_path):
+    screener = Screener(symbol_cache=False, report_store=False, session_path=False)
+    store = TimeseriesStore(str(tmp_path / "store"), compact_after=3)
+    grid = data_sheet_grid(years=6, quarters=6, seed=1)
+    export = str(tmp_path / f"export_{SYMBOL}.xlsx")
+    # P&L Sales, one annual period per column
+    sales_row = grid.index[grid[0] == "Sales"][0]
+    report_date_row = grid.index[grid[0] == "Report Date"][0]
+
+    write_workbook(export, grid)
+    first = screener.read_excel_incremental(export, SYMBOL, store)
+    assert len(first.annual_periods) == 6 and len(first.quarterly_periods) == 6
+    assert store._delta_paths(SYMBOL) == []
+
+    for update, column in enumerate([6, 5, 4], start=1):
+        grid.loc[sales_row, column] += 1000.0
+        write_workbook(export, grid)
+
+        result = screener.read_excel_incremental(export, SYMBOL, store)
+
+        changed = pd.Timestamp(grid.loc[report_date_row, column])
+        assert result.annual_periods == [changed]
+        assert result.quarterly_periods == []
+        assert set(result.rows["period_end"]) == {changed}
+        assert set(result.rows["period_code"]) == {"A"}
+        assert "sales" in set(result.rows["metric_name"])
+        assert result.trends is not None
+        pd.testing.assert_frame_equal(_sorted(store.load_symbol(SYMBOL)), _sorted(screener.read_excel(export, SYMBOL)))
+        # two deltas stay on disk; the third reaches compact_after and is folded into the base file
+        deltas = store._delta_paths(SYMBOL)
+        assert len(deltas) == (update if update < 3 else 0)
+        if deltas:
+            stored = pa.ipc.open_file(deltas[-1]).read_all().to_pandas()
+            assert len(stored) == len(result.rows)
+            assert set(stored["period_end"]) == {changed}
+
+    assert sorted(os.listdir(tmp_path / "store")) == [f"{SYMBOL}.arrow"]
@@ -0,0 +1,31 @@
+import json
+import os
+
+import ingest
+from ingest import IngestResult
+
+
+def _crash_on_syn2(path, symbol, size, mtime_ns):
+    if symbol == "SYN2":
+        os._exit(1)
+    return IngestResult(path, symbol, size, mtime_ns, "ok", rows=10), None
+
+
+def test_dead_worker_fails_only_its_own_file(tmp_path, monkeypatch):
+    # the worker functions are looked up in forked children, so patching the module is enough
+    monkeypatch.setattr(ingest, "_init_worker", lambda store_root: None)
+    monkeypatch.setattr(ingest, "_ingest_file", _crash_on_syn2)
+    files = []
+    for i in range(1, 7):
+        path = tmp_path / f"export_SYN{i}.xlsx"
+        path.write_bytes(b"x")
+        files.append((str(path), f"SYN{i}"))
+    manifest = tmp_path / "manifest.jsonl"
+
+    summary = ingest.ingest(files, store_root=str(tmp_path / "store"), manifest_path=str(manifest), workers=2)
+
+    assert summary["files_ok"] == 5
+    assert summary["files_failed"] == 1
+    with open(manifest, encoding="utf-8") as f:
+        status = {entry["symbol"]: entry["status"] for entry in map(json.loads, f)}
+    assert status == {f"SYN{i}": "error" if i == 2 else "ok" for i in range(1, 7)}
@@ -0,0 +1,21 @@
+import os
+
+import pandas as pd
+
+from screener import Screener
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def test_melt_combined_vectorized_matches_row_by_row_output():
+    # combined_long.csv is what the original row-by-row melt_combined produced for combined_wide.csv
+    combined_wide = pd.read_csv(os.path.join(ROOT, "combined_wide.csv"))
+    expected = pd.read_csv(os.path.join(DATA, "combined_long.csv"),
+                           parse_dates=["timestamp", "period_start", "period_end"])
+
+    screener = Screener(symbol_cache=False, report_store=False, session_path=False)
+    result = screener.melt_combined_vectorized(combined_wide, "ACC")
+
+    assert len(result) == 570
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from config import response_cache as response_cache_module
+from config.response_cache import ResponseCache
+
+
+def test_concurrent_requests_share_one_build():
+    calls = []
+
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b'{"symbol": "ACC"}'
+
+    async def run():
+        cache = ResponseCache()
+        entries = await asyncio.gather(*(cache.get_or_create("acc", create) for _ in range(300)))
+        return entries, await cache.get_or_create("ACC", create)
+
+    entries, later = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert {entry.etag for entry in entries} == {later.etag}
+    assert later.body == b'{"symbol": "ACC"}'
+
+
+def test_failed_build_is_not_cached():
+    calls = []
+
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("upstream down")
+        return b"ok"
+
+    async def run():
+        cache = ResponseCache()
+        failures = await asyncio.gather(*(cache.get_or_create("ACC", create) for _ in range(5)),
+                                        return_exceptions=True)
+        assert cache.get("ACC") is None
+        return failures, await cache.get_or_create("ACC", create)
+
+    failures, entry = asyncio.run(run())
+
+    assert all(isinstance(f, RuntimeError) for f in failures)
+    assert entry.body == b"ok"
+    assert len(calls) == 2
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    # only the cache's view of time; no event loop runs in these tests
+    monkeypatch.setattr(response_cache_module, "time", type("Clock", (), {"monotonic": staticmethod(lambda: now[0])}))
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl=60)
+    entry = cache.put("ACC", b"body")
+
+    clock[0] += 59
+    assert cache.get("ACC") is entry
+    assert cache.remaining_ttl(entry) == 1
+    clock[0] += 1
+    assert cache.get("ACC") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.put("ACC", b"a")
+    cache.put("TCS", b"t")
+    cache.get("ACC")
+    cache.put("INFY", b"i")
+
+    assert cache.get("TCS") is None
+    assert cache.get("ACC").body == b"a"
+    assert cache.get("INFY").body == b"i"
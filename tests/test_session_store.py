@@ -0,0 +1,76 @@
+import os
+import queue
+import threading
+
+import pytest
+
+from config.session_store import SessionPool
+from screener import Screener
+
+
+def _screener(server, tmp_path, session_path):
+    return Screener(base_url=server.base_url, reports_dir=str(tmp_path / "reports"), symbol_cache=False,
+                    report_store=False, session_path=session_path)
+
+
+def test_saved_session_is_reused_by_a_new_screener(fake_screener, tmp_path):
+    session_path = str(tmp_path / "session.json")
+    assert _screener(fake_screener, tmp_path, session_path).fetch_data("ACC")
+    assert fake_screener.hits["login"] == 1
+    assert os.stat(session_path).st_mode & 0o777 == 0o600
+
+    assert _screener(fake_screener, tmp_path, session_path).fetch_data("TCS")
+    assert fake_screener.hits["login"] == 1
+    assert fake_screener.hits["login_page"] == 1
+
+
+def test_expired_session_logs_in_once_and_retries(fake_screener, tmp_path):
+    screener = _screener(fake_screener, tmp_path, str(tmp_path / "session.json"))
+    assert screener.fetch_data("ACC")
+    fake_screener.expire_sessions()
+
+    assert screener.fetch_data("TCS")
+    assert fake_screener.hits["login"] == 2
+    assert fake_screener.hits["export_denied"] == 1
+
+
+def test_pooled_fetches_search_on_pool_sessions(fake_screener, tmp_path):
+    screener = _screener(fake_screener, tmp_path, str(tmp_path / "session.json"))
+
+    results = list(screener.fetch_many(["ACC", "TCS", "INFY"], sessions=2, requests_per_second=0))
+
+    assert all(r.ok for r in results)
+    assert fake_screener.hits["login"] == 2
+    # the main session (and its cookie file) is never needed
+    assert screener._session is None
+    assert sorted(os.listdir(tmp_path)) == ["reports", "session-0.json", "session-1.json"]
+
+
+def test_session_pool_blocks_and_reuses_sessions_once_full():
+    created = []
+
+    def create(slot):
+        created.append(slot)
+        return object()
+
+    pool = SessionPool(create, size=2)
+    with pool.checkout() as first, pool.checkout() as second:
+        assert first is not second
+        waiting = queue.Queue()
+
+        def third():
+            with pool.checkout(timeout=5) as session:
+                waiting.put(session)
+
+        thread = threading.Thread(target=third)
+        thread.start()
+        with pytest.raises(queue.Empty):
+            waiting.get(timeout=0.2)  # both sessions are checked out, so the third caller waits
+    thread.join()
+
+    assert waiting.get_nowait() in (first, second)
+    assert created == [0, 1]
+    with pytest.raises(queue.Empty):
+        with pool.checkout(timeout=0.1), pool.checkout(timeout=0.1), pool.checkout(timeout=0.1):
+            pass
+    assert created == [0, 1]
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.utils import calculate_trends, calculate_trends_batch, parse_sections
+
+NA = np.nan
+
+
+def _data_sheet():
+    # three annual periods but only two quarters: the quarters header ends in a blank column
+    return pd.DataFrame([
+        ["PROFIT & LOSS", NA, NA, NA],
+        ["Report Date", pd.Timestamp("2023-03-31"), pd.Timestamp("2024-03-31"), pd.Timestamp("2025-03-31")],
+        ["Sales", 100.0, 120.0, 150.0],
+        ["Quarters", NA, NA, NA],
+        ["Report Date", pd.Timestamp("2024-12-31"), pd.Timestamp("2025-03-31"), NA],
+        ["Sales", 30.0, 40.0, NA],
+        ["BALANCE SHEET", NA, NA, NA],
+        ["Report Date", pd.Timestamp("2023-03-31"), pd.Timestamp("2024-03-31"), pd.Timestamp("2025-03-31")],
+        ["Reserves", 10.0, 20.0, 30.0],
+    ])
+
+
+def test_blank_report_date_columns_are_skipped():
+    sections = parse_sections(_data_sheet())
+
+    quarters = sections["quarters"]
+    assert list(quarters.index) == [pd.Timestamp("2024-12-31"), pd.Timestamp("2025-03-31")]
+    assert quarters["Sales"].tolist() == [30.0, 40.0]
+    assert len(sections["pnl"]) == 3
+
+
+def _panel(with_stats=True):
+    rng = np.random.default_rng(7)
+    frames = []
+    # uneven histories, including too short for any growth window
+    for symbol, years in [("ONE", 1), ("TWO", 2), ("THREE", 3), ("SIX", 6), ("TWELVE", 12), ("NEG", 11),
+                          ("NAN", 9)]:
+        dates = pd.date_range("2010-03-31", periods=years, freq="12ME")
+        frame = pd.DataFrame({"symbol": symbol, "sales_pnl": rng.uniform(100, 1000, years)}, index=dates)
+        if with_stats:
+            frame["yearly OPM"] = rng.uniform(5, 30, years)
+            frame["price_to_earning"] = rng.uniform(8, 60, years)
+        frames.append(frame)
+    panel = pd.concat(frames)
+    # non-positive / missing starting sales for the long windows
+    panel.loc[(panel["symbol"] == "NEG") & (panel.index == panel[panel["symbol"] == "NEG"].index[0]), "sales_pnl"] = -5.0
+    panel.loc[(panel["symbol"] == "NAN") & (panel.index == panel[panel["symbol"] == "NAN"].index[0]), "sales_pnl"] = NA
+    if with_stats:
+        panel.loc[panel["symbol"] == "SIX", "price_to_earning"] = NA
+        panel.loc[panel.index[::4], "yearly OPM"] = NA
+    # unsorted input: the batch must order each symbol's rows itself
+    return panel.sample(frac=1, random_state=3)
+
+
+# calculate_trends warns on SIX's all-NaN P/E windows
+@pytest.mark.filterwarnings("ignore:Mean of empty slice:RuntimeWarning")
+@pytest.mark.parametrize("with_stats", [True, False])
+def test_calculate_trends_batch_matches_per_symbol(with_stats):
+    panel = _panel(with_stats)
+
+    batch = calculate_trends_batch(panel)
+
+    assert sorted(batch.index) == sorted(panel["symbol"].unique())
+    for symbol, rows in panel.groupby("symbol"):
+        single = calculate_trends(rows.drop(columns="symbol")).iloc[0]
+        assert list(batch.columns) == list(single.index)
+        pd.testing.assert_series_equal(batch.loc[symbol], single, check_names=False)
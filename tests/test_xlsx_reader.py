@@ -0,0 +1,79 @@
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape, unescape
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import data_sheet_grid
+from config.xlsx_reader import read_data_sheet
+
+INLINE_STRING_RE = re.compile(r'<c r="([A-Z]+\d+)"([^>]*?) t="inlineStr"><is><t[^>]*>(.*?)</t></is></c>')
+SST_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+SST_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+
+
+def share_strings(path):
+    """openpyxl writes inline strings; move them into xl/sharedStrings.xml the way Excel exports do."""
+    with zipfile.ZipFile(path) as zf:
+        parts = {name: zf.read(name).decode("utf-8") for name in zf.namelist()}
+
+    strings = {}
+
+    def shared(match):
+        index = strings.setdefault(unescape(match.group(3)), len(strings))
+        return f'<c r="{match.group(1)}"{match.group(2)} t="s"><v>{index}</v></c>'
+
+    for name in [n for n in parts if n.startswith("xl/worksheets/")]:
+        parts[name] = INLINE_STRING_RE.sub(shared, parts[name])
+    items = "".join(f"<si><t>{escape(s)}</t></si>" for s in strings)
+    parts["xl/sharedStrings.xml"] = (
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'count="{len(strings)}" uniqueCount="{len(strings)}">{items}</sst>'
+    )
+    parts["[Content_Types].xml"] = parts["[Content_Types].xml"].replace(
+        "</Types>", f'<Override PartName="/xl/sharedStrings.xml" ContentType="{SST_CONTENT_TYPE}"/></Types>')
+    parts["xl/_rels/workbook.xml.rels"] = parts["xl/_rels/workbook.xml.rels"].replace(
+        "</Relationships>", f'<Relationship Id="rIdSst" Target="sharedStrings.xml" Type="{SST_REL_TYPE}"/>'
+                            "</Relationships>")
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in parts.items():
+            zf.writestr(name, data)
+    return len(strings)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """An openpyxl-written export: shared strings, styled dates, "Data Sheet" second."""
+    wb = openpyxl.Workbook()
+    wb.active.title = "Profit & Loss"
+    wb.active.append(["Narration", "Mar 2024"])
+
+    sheet = wb.create_sheet("Data Sheet")
+    for values in data_sheet_grid(years=6, quarters=8, seed=3).itertuples(index=False):
+        sheet.append([None if pd.isna(v) else v for v in values])
+    sheet.append(["Custom date", datetime(2024, 12, 31)])
+    sheet.cell(sheet.max_row, 2).number_format = "dd-mmm-yyyy"
+    sheet.append(["Integer", 42, "Sales & <margin>"])
+
+    path = tmp_path / "export_OPENPYXL.xlsx"
+    wb.save(path)
+    assert share_strings(path) > 0
+    return path
+
+
+def test_read_data_sheet_matches_read_excel(workbook):
+    expected = pd.read_excel(workbook, sheet_name="Data Sheet", header=None)
+    actual = read_data_sheet(workbook)
+
+    assert "Sales & <margin>" in actual[2].tolist()
+    assert isinstance(actual.iloc[-2, 1], (datetime, pd.Timestamp))
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_read_data_sheet_missing_sheet(workbook):
+    with pytest.raises(ValueError, match="Balance Sheet"):
+        read_data_sheet(workbook, sheet_name="Balance Sheet")